@@ -1,6 +1,7 @@
 from openai import OpenAI
 from dotenv import load_dotenv
 import os
+from memory import ConversationMemory
 
 load_dotenv()
 gemini_key = os.getenv("GEMINI_API_KEY")
@@ -115,21 +116,40 @@ PERSONA_AUDIENCE = os.getenv("PERSONA_AUDIENCE", "intermediate developers")
 
 system_prompt = build_system_prompt(PROMPT_MODE, PERSONA_ROLE, PERSONA_TONE, PERSONA_AUDIENCE)
 
-message_history = [
-    {"role": "system", "content": system_prompt}
-]
+# older turns are folded into a rolling summary once the history exceeds this many tokens
+MEMORY_MAX_TOKENS = int(os.getenv("MEMORY_MAX_TOKENS", "4000"))
+SUMMARY_PROMPT = (
+    "Update the running summary of a conversation between a user and a coding assistant. "
+    "Keep decisions, requirements, names, code identifiers and open questions; drop small talk. "
+    "Reply with the updated summary only, in at most 200 words."
+)
+
 
-# add history
-user_query = input("Enter: ")
-message_history.append({"role": "user", "content": user_query})
+def summarize(summary, messages):
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    response = geminiClient.chat.completions.create(
+        model="gemini-2.5-flash",
+        messages=[
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": f"Summary so far:\n{summary or '(empty)'}\n\nNew messages:\n{transcript}"},
+        ]
+    )
+    return (response.choices[0].message.content or "").strip() or summary
+
+
+memory = ConversationMemory(system_prompt, max_tokens=MEMORY_MAX_TOKENS, summarize=summarize)
 
 while True:
+    # add history
+    user_query = input("Enter: ")
+    memory.add("user", user_query)
+
     responseGemini = geminiClient.chat.completions.create(
         model="gemini-2.5-flash",
-        messages=message_history
+        messages=memory.messages()
     )
 
     raw_output = responseGemini.choices[0].message.content
-    message_history.append({"role": "assistant", "content": raw_output})
+    memory.add("assistant", raw_output or "")
 
     print(raw_output)
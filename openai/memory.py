@@ -0,0 +1,129 @@
+from typing import Callable, Optional
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a character-based estimate
+    tiktoken = None
+
+# chat formats wrap every message in a few extra tokens (role, separators)
+MESSAGE_OVERHEAD = 4
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Token count of `text` with o200k_base when tiktoken is available, else ~4 characters per token."""
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base") if tiktoken else False
+        except Exception:  # the vocabulary is downloaded on first use; offline it may be missing
+            _encoding = False
+    if _encoding is False:
+        return len(text) // 4 + 1
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+class ConversationMemory:
+    """
+    Chat history that stays within a token budget.
+
+    - The system prompt is always sent first and is never dropped.
+    - Each message is counted once, when it is added; the running total is kept.
+    - When the history would exceed `max_tokens`, the oldest whole turns leave the window
+      until it is back under `fold_to * max_tokens`, so `summarize` runs every few turns
+      rather than on every message. They are folded into a rolling summary by
+      `summarize(summary, messages) -> str`, which is sent right after the system prompt.
+      Without `summarize` they are simply dropped.
+    - The newest `min_recent` messages always stay verbatim, even over budget, and the
+      window always starts with a user message.
+    - If `summarize` raises, the history is left unchanged and the message is not added.
+
+    Example:
+        >>> memory = ConversationMemory(system_prompt, max_tokens=4000, summarize=summarize)
+        >>> memory.add("user", "hi")
+        >>> client.chat.completions.create(model=..., messages=memory.messages())
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        *,
+        max_tokens: int = 4000,
+        min_recent: int = 2,
+        fold_to: float = 0.6,
+        summarize: Optional[Callable[[str, list[dict]], str]] = None,
+        count: Callable[[str], int] = count_tokens,
+    ):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be > 0")
+        if min_recent < 1:
+            raise ValueError("min_recent must be >= 1")
+        if not 0 < fold_to <= 1:
+            raise ValueError("fold_to must be in (0, 1]")
+        self.max_tokens = max_tokens
+        self.min_recent = min_recent
+        self.fold_to = fold_to
+        self.summarize = summarize
+        self.count = count
+        self.system = {"role": "system", "content": system_prompt}
+        self.system_tokens = self._tokens(system_prompt)
+        self.summary = ""
+        self.summary_tokens = 0
+        # window of verbatim messages and their token counts, oldest first
+        self.window: list[dict] = []
+        self.window_tokens: list[int] = []
+        self.total_tokens = self.system_tokens
+
+    def _tokens(self, content: str) -> int:
+        return self.count(content) + MESSAGE_OVERHEAD
+
+    def add(self, role: str, content: str):
+        tokens = self._tokens(content)
+        if self.total_tokens + tokens > self.max_tokens:
+            # fold before appending, so a failing summarize leaves everything as it was
+            self._fold(role, tokens)
+        self.window.append({"role": role, "content": content})
+        self.window_tokens.append(tokens)
+        self.total_tokens += tokens
+
+    def _fold(self, role: str, tokens: int):
+        # oldest messages leave the window until it is under the fold target, whole turns at a time
+        roles = [m["role"] for m in self.window] + [role]
+        total = self.total_tokens + tokens
+        target = self.fold_to * self.max_tokens
+        n, freed = 0, 0
+        keep_from = min(len(roles) - self.min_recent, len(self.window))
+        while n < keep_from and total - freed > target:
+            freed += self.window_tokens[n]
+            n += 1
+        while n < keep_from and roles[n] != "user":
+            freed += self.window_tokens[n]
+            n += 1
+        # stopped by min_recent mid-turn: keep that whole turn instead
+        while n > 0 and roles[n] != "user":
+            n -= 1
+            freed -= self.window_tokens[n]
+        if n == 0:
+            return
+        evicted = self.window[:n]
+        if self.summarize is not None:
+            # summarize first: if it fails, the history is left unchanged
+            summary = self.summarize(self.summary, evicted)
+            summary_tokens = self._tokens(_summary_message(summary)["content"]) if summary else 0
+            self.total_tokens += summary_tokens - self.summary_tokens
+            self.summary, self.summary_tokens = summary, summary_tokens
+        del self.window[:n]
+        del self.window_tokens[:n]
+        self.total_tokens -= freed
+
+    def messages(self) -> list[dict]:
+        """Messages to send: system prompt, rolling summary (if any), then the recent window."""
+        out = [self.system]
+        if self.summary:
+            out.append(_summary_message(self.summary))
+        return out + self.window
+
+
+def _summary_message(summary: str) -> dict:
+    return {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
@@ -6,6 +6,33 @@ embedding, and similarity search capabilities. It is dependency-light and
 integrates with OpenAI embeddings by default.
 """
 
-from .vector_store import Embedder, OpenAIEmbedder, Document, VectorStore
+from .vector_store import AsyncEmbedder, AsyncOpenAIEmbedder, Chunk, Embedder, HashingEmbedder, OpenAIEmbedder, Document, VectorStore
+from .ann import VectorIndex, IVFIndex
+from .bm25 import BM25Index
+from .dedup import MinHashLSH
+from .embedding_cache import CachingEmbedder
+from .metadata_index import MetadataIndex
+from .quantization import Quantizer, Float16Quantizer, Int8Quantizer, BinaryQuantizer
+from .sharding import ShardedSearcher
 
-__all__ = ["Embedder", "OpenAIEmbedder", "Document", "VectorStore"]
+__all__ = [
+    "AsyncEmbedder",
+    "AsyncOpenAIEmbedder",
+    "Chunk",
+    "Embedder",
+    "HashingEmbedder",
+    "OpenAIEmbedder",
+    "Document",
+    "VectorStore",
+    "VectorIndex",
+    "IVFIndex",
+    "BM25Index",
+    "MinHashLSH",
+    "CachingEmbedder",
+    "MetadataIndex",
+    "Quantizer",
+    "Float16Quantizer",
+    "Int8Quantizer",
+    "BinaryQuantizer",
+    "ShardedSearcher",
+]
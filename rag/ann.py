@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Protocol, Type
+
+import numpy as np
+
+
+class VectorIndex(Protocol):
+    """
+    Protocol for approximate nearest-neighbour indexes used by `VectorStore`.
+
+    An index only proposes candidate rows; the store scores the candidates exactly
+    and does the final top-k selection. Rows are referenced by their position in the
+    store's embedding matrix and are always added in order.
+    """
+
+    def add(self, matrix: np.ndarray, start: int) -> None:  # pragma: no cover - protocol
+        """Index rows `matrix[start:]`; `matrix` holds every active, normalized row."""
+        ...
+
+    def candidates(self, queries: np.ndarray) -> Optional[List[np.ndarray]]:  # pragma: no cover - protocol
+        """Candidate row ids per query, or None to fall back to exact search."""
+        ...
+
+    def reset(self) -> None:  # pragma: no cover - protocol
+        ...
+
+    def compact(self, keep: np.ndarray) -> None:  # pragma: no cover - protocol
+        """Drop rows where `keep` is False and renumber the remaining rows in order."""
+        ...
+
+    def config(self) -> Dict[str, Any]:  # pragma: no cover - protocol
+        ...
+
+    def arrays(self) -> Dict[str, np.ndarray]:  # pragma: no cover - protocol
+        ...
+
+
+def _kmeans(
+    data: np.ndarray,
+    n_clusters: int,
+    *,
+    n_iter: int = 20,
+    seed: int = 0,
+    block_size: int = 65536,
+) -> np.ndarray:
+    """
+    Spherical k-means on L2-normalized rows; returns normalized centroids.
+
+    Empty clusters are re-seeded from random points so every centroid stays useful.
+    """
+
+    rng = np.random.default_rng(seed)
+    n = data.shape[0]
+    centroids = data[rng.choice(n, size=n_clusters, replace=False)].astype(np.float32, copy=True)
+    for _ in range(n_iter):
+        assign = _assign(data, centroids, block_size)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        counts = np.bincount(assign, minlength=n_clusters)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = data[rng.choice(n, size=int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        np.divide(sums, norms, out=sums, where=norms > 0)
+        centroids = sums
+    return centroids
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray, block_size: int = 65536) -> np.ndarray:
+    """Nearest (highest inner product) centroid for each row, computed in blocks."""
+    out = np.empty(data.shape[0], dtype=np.int32)
+    for start in range(0, data.shape[0], block_size):
+        block = data[start : start + block_size]
+        out[start : start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+class IVFIndex:
+    """
+    Inverted-file (IVF) index over k-means centroids.
+
+    - Rows are bucketed under their nearest of `nlist` centroids.
+    - A query scans only the `nprobe` closest buckets; raise `nprobe` for recall,
+      lower it for speed (nprobe == nlist is exhaustive).
+    - Training happens automatically once `train_size` rows exist (default
+      `39 * nlist`); until then the store keeps using exact search.
+    - Centroids are not retrained as the store grows; call `train` to refresh them.
+    """
+
+    kind = "ivf"
+
+    def __init__(
+        self,
+        nlist: int = 1024,
+        nprobe: int = 16,
+        *,
+        train_size: Optional[int] = None,
+        max_train_points: Optional[int] = None,
+        n_iter: int = 20,
+        seed: int = 0,
+    ) -> None:
+        if nlist <= 0:
+            raise ValueError("nlist must be > 0")
+        if nprobe <= 0:
+            raise ValueError("nprobe must be > 0")
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size if train_size is not None else 39 * nlist
+        self.max_train_points = max_train_points if max_train_points is not None else 256 * nlist
+        self.n_iter = n_iter
+        self.seed = seed
+        self.reset()
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def reset(self) -> None:
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._lists: List[np.ndarray] = []
+        self._list_sizes = np.zeros(0, dtype=np.int64)
+
+    def compact(self, keep: np.ndarray) -> None:
+        if self._centroids is not None:
+            self._set_assignments(self._assignments[keep])
+
+    def train(self, matrix: np.ndarray) -> None:
+        """(Re)compute centroids from `matrix` and re-bucket every row."""
+        n = matrix.shape[0]
+        if n < self.nlist:
+            raise ValueError(f"need at least nlist={self.nlist} rows to train, got {n}")
+        sample = matrix
+        if n > self.max_train_points:
+            rng = np.random.default_rng(self.seed)
+            sample = matrix[np.sort(rng.choice(n, size=self.max_train_points, replace=False))]
+        self._centroids = _kmeans(np.asarray(sample, dtype=np.float32), self.nlist, n_iter=self.n_iter, seed=self.seed)
+        self._set_assignments(_assign(matrix, self._centroids))
+
+    def add(self, matrix: np.ndarray, start: int) -> None:
+        if self._centroids is None:
+            if matrix.shape[0] >= max(self.train_size, self.nlist):
+                self.train(matrix)
+            return
+        assign = _assign(matrix[start:], self._centroids)
+        self._assignments = np.concatenate([self._assignments, assign])
+        rows = np.arange(start, start + assign.shape[0], dtype=np.int64)
+        order = np.argsort(assign, kind="stable")
+        lists, bounds = np.unique(assign[order], return_index=True)
+        for lst, chunk in zip(lists, np.split(rows[order], bounds[1:])):
+            self._append_to_list(int(lst), chunk)
+
+    def _append_to_list(self, lst: int, rows: np.ndarray) -> None:
+        size = int(self._list_sizes[lst])
+        buf = self._lists[lst]
+        needed = size + rows.shape[0]
+        if needed > buf.shape[0]:
+            grown = np.empty(max(needed, 2 * buf.shape[0], 16), dtype=np.int64)
+            grown[:size] = buf[:size]
+            self._lists[lst] = buf = grown
+        buf[size:needed] = rows
+        self._list_sizes[lst] = needed
+
+    def _set_assignments(self, assignments: np.ndarray) -> None:
+        self._assignments = assignments.astype(np.int32, copy=False)
+        order = np.argsort(self._assignments, kind="stable")
+        counts = np.bincount(self._assignments, minlength=self.nlist)
+        self._lists = np.split(order.astype(np.int64), np.cumsum(counts)[:-1])
+        self._list_sizes = counts.astype(np.int64)
+
+    def candidates(self, queries: np.ndarray) -> Optional[List[np.ndarray]]:
+        if self._centroids is None:
+            return None
+        nprobe = min(self.nprobe, self.nlist)
+        centroid_scores = queries @ self._centroids.T
+        probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+        out: List[np.ndarray] = []
+        for row in probes:
+            parts = [self._lists[lst][: self._list_sizes[lst]] for lst in row]
+            out.append(np.sort(np.concatenate(parts)))
+        return out
+
+    # --------------- Persistence ---------------
+    def config(self) -> Dict[str, Any]:
+        return {
+            "type": self.kind,
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "train_size": self.train_size,
+            "max_train_points": self.max_train_points,
+            "n_iter": self.n_iter,
+            "seed": self.seed,
+        }
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        if self._centroids is None:
+            return {}
+        return {"centroids": self._centroids, "assignments": self._assignments}
+
+    @classmethod
+    def from_state(cls, config: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> "IVFIndex":
+        params = {key: value for key, value in config.items() if key != "type"}
+        index = cls(**params)
+        if "centroids" in arrays:
+            index._centroids = np.asarray(arrays["centroids"], dtype=np.float32)
+            index._set_assignments(np.asarray(arrays["assignments"]))
+        return index
+
+
+_INDEX_TYPES: Dict[str, Type[Any]] = {IVFIndex.kind: IVFIndex}
+
+
+def load_index(config: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> VectorIndex:
+    """Rebuild an index from the `config()` / `arrays()` pair written by `VectorStore.save`."""
+    kind = config.get("type")
+    if kind not in _INDEX_TYPES:
+        raise ValueError(f"Unsupported index type: {kind}")
+    return _INDEX_TYPES[kind].from_state(config, arrays)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import threading
+import time
+
+import numpy as np
+
+
+class AnswerCache:
+    """
+    Semantic (query embedding -> answer) cache stored in Redis.
+
+    - A lookup returns the cached answer of the most similar earlier query when the
+      cosine similarity reaches `threshold`; otherwise it is a miss.
+    - Every entry expires after `ttl` seconds; beyond `max_entries` the least recently
+      used entries are evicted.
+    - `invalidate()` drops every entry at once (call it after re-indexing the collection).
+      It bumps a generation counter, so all workers stop using old entries immediately.
+    - Each process keeps a local copy of the cached vectors and fetches only entries
+      added since its last lookup, so a lookup is one small Redis round trip plus a
+      matrix-vector product.
+    - Hit/miss counters are shared by all processes; see `stats()`.
+    - Safe to share between threads: the local copy is only touched under a lock.
+
+    Example:
+        >>> cache = AnswerCache(Redis(), namespace="test_collection")
+        >>> answer = cache.lookup(vector)
+        >>> if answer is None:
+        ...     answer = generate(...)
+        ...     cache.store(query, vector, answer)
+    """
+
+    def __init__(
+        self,
+        redis: Any,
+        namespace: str = "default",
+        *,
+        threshold: float = 0.95,
+        ttl: int = 24 * 3600,
+        max_entries: int = 2000,
+    ) -> None:
+        if not -1.0 <= threshold <= 1.0:
+            raise ValueError("threshold must be in [-1, 1]")
+        if ttl <= 0:
+            raise ValueError("ttl must be > 0")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be > 0")
+        self._redis = redis
+        self._prefix = f"rag:answers:{namespace}"
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Guards the local mirror: `_ids` and `_vectors` must always change together.
+        self._lock = threading.Lock()
+        self._reset_local(None)
+
+    # --------------- Keys ---------------
+    def _generation(self) -> int:
+        return int(self._redis.get(f"{self._prefix}:gen") or 0)
+
+    def _key(self, generation: int, name: str) -> str:
+        return f"{self._prefix}:{generation}:{name}"
+
+    def _entry_key(self, generation: int, entry_id: str) -> str:
+        return self._key(generation, f"entry:{entry_id}")
+
+    # --------------- Local mirror ---------------
+    def _reset_local(self, generation: Optional[int]) -> None:
+        self._local_generation = generation
+        self._local_seq = 0.0
+        self._ids: List[str] = []
+        self._vectors: Optional[np.ndarray] = None
+
+    def _sync(self) -> int:
+        """Bring the local vector copy up to date; returns the current generation."""
+        generation = self._generation()
+        log = self._key(generation, "log")
+        newest = self._redis.zrange(log, -1, -1, withscores=True)
+        if (
+            generation != self._local_generation
+            or len(self._ids) > 2 * self.max_entries
+            or (newest[0][1] if newest else 0.0) < self._local_seq
+        ):
+            # New generation, too many locally known entries evicted elsewhere, or the
+            # log expired while this process was idle.
+            self._reset_local(generation)
+        new = self._redis.zrangebyscore(log, f"({self._local_seq}", "+inf", withscores=True)
+        if not new:
+            return generation
+        pipe = self._redis.pipeline(transaction=False)
+        for entry_id, _ in new:
+            pipe.hget(self._entry_key(generation, _text(entry_id)), "vector")
+        blobs = pipe.execute()
+        ids, rows = [], []
+        for (entry_id, seq), blob in zip(new, blobs):
+            self._local_seq = max(self._local_seq, seq)
+            if blob is not None:
+                ids.append(_text(entry_id))
+                rows.append(np.frombuffer(blob, dtype=np.float32))
+        if rows:
+            block = np.stack(rows)
+            if self._vectors is not None and self._vectors.shape[1] != block.shape[1]:
+                self._reset_local(generation)
+            self._vectors = block if self._vectors is None else np.vstack([self._vectors, block])
+            self._ids.extend(ids)
+        return generation
+
+    def _forget(self, positions: Sequence[int]) -> None:
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[list(positions)] = False
+        self._ids = [i for i, k in zip(self._ids, keep) if k]
+        self._vectors = self._vectors[keep] if self._ids else None  # type: ignore[index]
+
+    # --------------- Public API ---------------
+    def lookup(self, vector: Sequence[float]) -> Optional[str]:
+        """Cached answer for the closest earlier query at or above `threshold`, else None."""
+        q = _normalize(vector)
+        answer: Optional[str] = None
+        with self._lock:
+            generation = self._sync()
+            if self._vectors is not None and self._vectors.shape[1] == q.shape[0]:
+                scores = self._vectors @ q
+                candidates = np.flatnonzero(scores >= self.threshold)
+                expired: List[int] = []
+                for pos in candidates[np.argsort(-scores[candidates], kind="stable")]:
+                    entry_id = self._ids[pos]
+                    cached = self._redis.hget(self._entry_key(generation, entry_id), "answer")
+                    if cached is None:
+                        expired.append(int(pos))  # expired or evicted by another worker
+                        continue
+                    answer = _text(cached)
+                    self._redis.zadd(self._key(generation, "lru"), {entry_id: time.time()})
+                    break
+                if expired:
+                    self._forget(expired)
+        self._redis.hincrby(f"{self._prefix}:stats", "hits" if answer is not None else "misses", 1)
+        return answer
+
+    def store(self, query: str, vector: Sequence[float], answer: str) -> None:
+        """Cache `answer` for `query`, evicting expired and least recently used entries."""
+        generation = self._generation()
+        # Namespace-wide and never expiring, so ids stay unique across idle periods and generations.
+        entry_id = str(self._redis.incr(f"{self._prefix}:seq"))
+        now = time.time()
+        entry_key = self._entry_key(generation, entry_id)
+        pipe = self._redis.pipeline()
+        pipe.hset(entry_key, mapping={"query": query, "answer": answer, "vector": _normalize(vector).tobytes()})
+        pipe.expire(entry_key, self.ttl)
+        pipe.zadd(self._key(generation, "log"), {entry_id: int(entry_id)})
+        pipe.zadd(self._key(generation, "lru"), {entry_id: now})
+        for name in ("log", "lru"):
+            pipe.expire(self._key(generation, name), self.ttl)
+        pipe.execute()
+        self._evict(generation, now)
+
+    def _evict(self, generation: int, now: float) -> None:
+        lru = self._key(generation, "lru")
+        # An entry last used more than `ttl` ago was created even earlier, so it has expired.
+        stale = [_text(i) for i in self._redis.zrangebyscore(lru, "-inf", now - self.ttl)]
+        overflow = self._redis.zcard(lru) - len(stale) - self.max_entries
+        if overflow > 0:
+            ranked = self._redis.zrange(lru, 0, len(stale) + overflow - 1)
+            stale = [_text(i) for i in ranked]
+        if not stale:
+            return
+        pipe = self._redis.pipeline()
+        pipe.zrem(lru, *stale)
+        pipe.zrem(self._key(generation, "log"), *stale)
+        pipe.delete(*(self._entry_key(generation, i) for i in stale))
+        pipe.execute()
+
+    def invalidate(self) -> int:
+        """Drop every cached answer (e.g. after re-indexing); returns the new generation."""
+        old = self._generation()
+        generation = int(self._redis.incr(f"{self._prefix}:gen"))
+        # Old entries are unreachable now; delete their bookkeeping and let entries expire.
+        self._redis.delete(*(self._key(old, name) for name in ("log", "lru")))
+        with self._lock:
+            self._reset_local(generation)
+        return generation
+
+    def stats(self) -> Dict[str, float]:
+        counts = self._redis.hgetall(f"{self._prefix}:stats")
+        hits = int(counts.get(b"hits", counts.get("hits", 0)))
+        misses = int(counts.get(b"misses", counts.get("misses", 0)))
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": int(self._redis.zcard(self._key(self._generation(), "lru"))),
+            "generation": self._generation(),
+        }
+
+    def reset_stats(self) -> None:
+        self._redis.delete(f"{self._prefix}:stats")
+
+
+def _normalize(vector: Sequence[float]) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(v)
+    return v / norm if norm > 0 else v
+
+
+def _text(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
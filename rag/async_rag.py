@@ -0,0 +1,30 @@
+import asyncio
+
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+from jobs.worker import CHAT_MODEL, COLLECTION_NAME, EMBEDDING_MODEL, answer_cache, build_messages
+from qdrant_factory import get_async_client
+
+load_dotenv()
+
+# same retrieval + generation as jobs.worker.answer_query, but on the event loop
+client = AsyncOpenAI()
+
+
+async def answer_query_async(q: str):
+    response = await client.embeddings.create(model=EMBEDDING_MODEL, input=[q])
+    vector = response.data[0].embedding
+    # redis calls are blocking; keep them off the event loop
+    cached = await asyncio.to_thread(answer_cache.lookup, vector)
+    if cached is not None:
+        return cached
+
+    # langchain_qdrant stores the chunk text in the "page_content" payload field
+    hits = await get_async_client().query_points(COLLECTION_NAME, query=vector, limit=3, with_payload=True)
+    context = "\n\n\n".join([(p.payload or {}).get("page_content", "") for p in hits.points])
+
+    completion = await client.chat.completions.create(model=CHAT_MODEL, messages=build_messages(q, context))
+    answer = completion.choices[0].message.content
+    if answer:
+        await asyncio.to_thread(answer_cache.store, q, vector, answer)
+    return answer
@@ -0,0 +1,217 @@
+"""
+Offline benchmark suite for `rag.vector_store`.
+
+Runs entirely locally with `HashingEmbedder`, so results are deterministic and free.
+For each corpus size it times chunking, indexing, search, save and load, and writes
+one JSON document that can be diffed against earlier runs.
+
+Usage:
+    python -m rag.bench --sizes 10000 100000 1000000 --out bench.json
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from .vector_store import Document, HashingEmbedder, VectorStore
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def _synthetic_words(rng: np.random.Generator, vocab: Sequence[str], n: int) -> str:
+    return " ".join(vocab[i] for i in rng.integers(0, len(vocab), n))
+
+
+def _vocabulary(size: int, seed: int) -> List[str]:
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    return ["".join(rng.choice(letters, rng.integers(3, 10))) for _ in range(size)]
+
+
+def _documents(n: int, words: int, vocab: Sequence[str], seed: int) -> Iterator[Document]:
+    rng = np.random.default_rng(seed)
+    for i in range(n):
+        yield Document(text=_synthetic_words(rng, vocab, words), metadata={"n": i}, id=f"doc-{i}")
+
+
+def _peak_rss_mb() -> float:
+    # Process-wide high-water mark: it never goes down, so it cannot be split by stage.
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    arr = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p90_ms": float(np.percentile(arr, 90)),
+        "p99_ms": float(np.percentile(arr, 99)),
+        "mean_ms": float(arr.mean()),
+        "max_ms": float(arr.max()),
+    }
+
+
+def _measure(fn: Callable[[], Any], trace_memory: bool) -> Dict[str, Any]:
+    """Run `fn` once, returning wall time, its result and (with `trace_memory`) its traced peak."""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+        seconds = time.perf_counter() - start
+        out: Dict[str, Any] = {"seconds": seconds, "result": result}
+        if trace_memory:
+            out["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return out
+
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def run_size(
+    n: int,
+    *,
+    dimension: int = 256,
+    words_per_chunk: int = 60,
+    queries: int = 200,
+    k: int = 10,
+    batch_size: int = 512,
+    seed: int = 0,
+    trace_memory: bool = False,
+    workdir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Benchmark every stage for a store of `n` chunks."""
+    vocab = _vocabulary(5000, seed)
+    embedder = HashingEmbedder(dimension=dimension, seed=seed)
+    report: Dict[str, Any] = {"size": n, "dimension": dimension, "words_per_chunk": words_per_chunk}
+
+    # chunk_text: one document that splits into `n` chunks (capped at 100k to bound the
+    # input string) of 200 words with 50 words overlap.
+    chunk_size, overlap = 200, 50
+    text_words = min(n, 100_000) * (chunk_size - overlap) + overlap
+    text = _synthetic_words(np.random.default_rng(seed), vocab, text_words)
+    m = _measure(lambda: VectorStore.chunk_text(text, chunk_size, overlap), trace_memory)
+    chunks = len(m.pop("result"))
+    report["chunk_text"] = {
+        **m,
+        "chunks": chunks,
+        "input_mb": len(text) / (1024 * 1024),
+        "chunks_per_sec": chunks / m["seconds"],
+        "mb_per_sec": len(text) / (1024 * 1024) / m["seconds"],
+    }
+    del text
+
+    # add_documents: `n` pre-sized chunks (chunk=False) streamed from a generator.
+    store = VectorStore(embedder)
+    docs = _documents(n, words_per_chunk, vocab, seed)
+    m = _measure(lambda: store.add_documents(docs, chunk=False, batch_size=batch_size), trace_memory)
+    added = m.pop("result")
+    report["add_documents"] = {**m, "chunks": added, "chunks_per_sec": added / m["seconds"]}
+
+    # search: single-query latency distribution plus one batched search_many.
+    rng = np.random.default_rng(seed + 1)
+    query_texts = [_synthetic_words(rng, vocab, 8) for _ in range(queries)]
+    latencies: List[float] = []
+    for q in query_texts:
+        start = time.perf_counter()
+        store.search(q, k)
+        latencies.append(time.perf_counter() - start)
+    m = _measure(lambda: store.search_many(query_texts, k), False)
+    report["search"] = {
+        "queries": queries,
+        "k": k,
+        **_percentiles(latencies),
+        "qps": queries / sum(latencies),
+        "batched_qps": queries / m["seconds"],
+    }
+
+    # save / load (copy and mmap).
+    root = tempfile.mkdtemp(prefix="rag-bench-", dir=workdir)
+    path = os.path.join(root, "store")
+    try:
+        m = _measure(lambda: store.save(path), trace_memory)
+        m.pop("result")
+        size_mb = _dir_size(path) / (1024 * 1024)
+        report["save"] = {**m, "size_mb": size_mb, "mb_per_sec": size_mb / m["seconds"]}
+        del store
+        for name, mmap in (("load", False), ("load_mmap", True)):
+            m = _measure(lambda: VectorStore.load(path, embedder, mmap=mmap), trace_memory)
+            loaded = m.pop("result")
+            report[name] = {**m, "chunks": len(loaded), "mb_per_sec": size_mb / m["seconds"]}
+            del loaded
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return report
+
+
+def run(sizes: Sequence[int] = DEFAULT_SIZES, **kwargs: Any) -> Dict[str, Any]:
+    """Run `run_size` for every size and wrap the results with environment metadata."""
+    results = [run_size(n, **kwargs) for n in sizes]
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {"sizes": list(sizes), **kwargs},
+            # once per run; per-stage memory is `peak_traced_mb` (--trace-memory)
+            "peak_rss_mb": _peak_rss_mb(),
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline VectorStore benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--words-per-chunk", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="per-stage peaks via tracemalloc (slower)")
+    parser.add_argument("--workdir", default=None, help="directory for temporary save/load files")
+    parser.add_argument("--out", default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = run(
+        args.sizes,
+        dimension=args.dimension,
+        words_per_chunk=args.words_per_chunk,
+        queries=args.queries,
+        k=args.k,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        trace_memory=args.trace_memory,
+        workdir=args.workdir,
+    )
+    payload = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
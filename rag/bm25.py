@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+
+import math
+import re
+
+import numpy as np
+
+# Words plus identifier-like runs joined by punctuation ("ORD-12345", "sku_9/B", "v1.2").
+_TOKEN = re.compile(r"\w+(?:[-./:#]\w+)*")
+_JOINER = re.compile(r"[-./:#]")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased BM25 terms for `text`.
+
+    Identifiers such as "ORD-12345" are kept whole and also split into their parts,
+    so both the exact code and a partial "12345" match.
+    """
+    out: List[str] = []
+    for match in _TOKEN.finditer(text.lower()):
+        token = match.group()
+        out.append(token)
+        parts = _JOINER.split(token)
+        if len(parts) > 1:
+            out.extend(parts)
+    return out
+
+
+class BM25Index:
+    """
+    Incremental Okapi BM25 inverted index over chunk texts.
+
+    - Each term maps to the rows containing it and their term frequencies.
+    - Rows are appended in order and referenced by their position in the store, like
+      `MetadataIndex`; `compact(keep)` drops rows and renumbers the rest.
+    - Corpus statistics (document count, average length) include rows that were
+      deleted but not yet compacted.
+    """
+
+    kind = "bm25"
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        if k1 < 0:
+            raise ValueError("k1 must be >= 0")
+        if not 0 <= b <= 1:
+            raise ValueError("b must be in [0, 1]")
+        self.k1 = k1
+        self.b = b
+        self.reset()
+
+    def reset(self) -> None:
+        self._postings: Dict[str, array] = {}
+        self._freqs: Dict[str, array] = {}
+        self._lengths = array("q")
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, texts: Iterable[str], start: int) -> None:
+        """Index texts for consecutive rows beginning at `start`."""
+        if start != len(self._lengths):
+            raise ValueError(f"rows must be added in order: expected start={len(self._lengths)}, got {start}")
+        for row, text in enumerate(texts, start):
+            tokens = tokenize(text)
+            self._lengths.append(len(tokens))
+            self._total_length += len(tokens)
+            for term, tf in Counter(tokens).items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = array("q")
+                    self._freqs[term] = array("i")
+                postings.append(row)
+                self._freqs[term].append(tf)
+
+    def scores(self, query: str, n_rows: int) -> np.ndarray:
+        """BM25 score of `query` for each of the first `n_rows` rows (0.0 where no term matches)."""
+        out = np.zeros(n_rows, dtype=np.float32)
+        n = len(self._lengths)
+        if not n:
+            return out
+        lengths = np.frombuffer(self._lengths, dtype=np.int64)
+        avgdl = self._total_length / n or 1.0
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            rows = np.frombuffer(postings, dtype=np.int64)
+            tf = np.frombuffer(self._freqs[term], dtype=np.int32).astype(np.float32)
+            idf = math.log(1.0 + (n - rows.shape[0] + 0.5) / (rows.shape[0] + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * lengths[rows] / avgdl)
+            # A term appears at most once per row in its postings, so plain fancy-index += is safe.
+            out[rows] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return out
+
+    def compact(self, keep: np.ndarray) -> None:
+        """Drop rows where `keep` is False and renumber the remaining rows in order."""
+        remap = np.cumsum(keep, dtype=np.int64) - 1
+        for term in list(self._postings):
+            rows = np.frombuffer(self._postings[term], dtype=np.int64)
+            mask = keep[rows]
+            if not mask.any():
+                del self._postings[term], self._freqs[term]
+                continue
+            if mask.all():
+                self._postings[term] = array("q", remap[rows].tobytes())
+                continue
+            self._postings[term] = array("q", remap[rows[mask]].tobytes())
+            self._freqs[term] = array("i", np.frombuffer(self._freqs[term], dtype=np.int32)[mask].tobytes())
+        lengths = np.frombuffer(self._lengths, dtype=np.int64)[keep[: len(self._lengths)]]
+        self._lengths = array("q", lengths.tobytes())
+        self._total_length = int(lengths.sum())
+
+    # --------------- Persistence ---------------
+    def config(self) -> Dict[str, Any]:
+        return {"type": self.kind, "k1": self.k1, "b": self.b}
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Postings flattened CSR-style: terms (newline-joined UTF-8), offsets, rows, freqs, lengths."""
+        terms = list(self._postings)
+        sizes = np.fromiter((len(self._postings[t]) for t in terms), dtype=np.int64, count=len(terms))
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        rows = [np.frombuffer(self._postings[t], dtype=np.int64) for t in terms]
+        freqs = [np.frombuffer(self._freqs[t], dtype=np.int32) for t in terms]
+        return {
+            # Terms never contain "\n" (they are runs of word characters and punctuation).
+            "terms": np.frombuffer("\n".join(terms).encode("utf-8"), dtype=np.uint8),
+            "offsets": offsets,
+            "rows": np.concatenate(rows) if rows else np.empty(0, dtype=np.int64),
+            "freqs": np.concatenate(freqs) if freqs else np.empty(0, dtype=np.int32),
+            "lengths": np.frombuffer(self._lengths, dtype=np.int64),
+        }
+
+    @classmethod
+    def from_state(cls, config: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> "BM25Index":
+        index = cls(k1=config.get("k1", 1.2), b=config.get("b", 0.75))
+        blob = arrays["terms"].tobytes().decode("utf-8")
+        terms = blob.split("\n") if blob else []
+        offsets = arrays["offsets"]
+        rows = np.ascontiguousarray(arrays["rows"], dtype=np.int64)
+        freqs = np.ascontiguousarray(arrays["freqs"], dtype=np.int32)
+        for i, term in enumerate(terms):
+            lo, hi = int(offsets[i]), int(offsets[i + 1])
+            index._postings[term] = array("q", rows[lo:hi].tobytes())
+            index._freqs[term] = array("i", freqs[lo:hi].tobytes())
+        lengths = np.ascontiguousarray(arrays["lengths"], dtype=np.int64)
+        index._lengths = array("q", lengths.tobytes())
+        index._total_length = int(lengths.sum())
+        return index
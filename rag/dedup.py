@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import re
+import zlib
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+_EMPTY = np.zeros(1, dtype=np.uint64)
+
+
+def _bands_for(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    (bands, rows) with bands * rows == num_perm whose LSH threshold (1/b)^(1/r) is the
+    highest one not above `threshold`, so true near-duplicates are rarely missed.
+    """
+    best: Optional[Tuple[float, int, int]] = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        approx = (1.0 / bands) ** (1.0 / rows)
+        if approx <= threshold and (best is None or approx > best[0]):
+            best = (approx, bands, rows)
+    return (num_perm, 1) if best is None else (best[1], best[2])
+
+
+class MinHashLSH:
+    """
+    Near-duplicate detection for chunk texts with MinHash signatures and LSH banding.
+
+    - A text is reduced to lowercased word `shingle_size`-grams; two texts are near
+      duplicates when the estimated Jaccard similarity of their shingles reaches `threshold`.
+    - Signatures are `num_perm` multiply-shift hashes, split into bands so that only
+      texts sharing a whole band are compared.
+    - Entries are positional (0, 1, 2, ...) like the store's rows; `compact(keep)` drops
+      entries and renumbers the rest.
+    """
+
+    kind = "minhash"
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, shingle_size: int = 3, seed: int = 0) -> None:
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if num_perm <= 0:
+            raise ValueError("num_perm must be > 0")
+        if shingle_size <= 0:
+            raise ValueError("shingle_size must be > 0")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        # Odd multipliers make (a * x + b) >> 32 a universal hash family on 64-bit words.
+        self._a = rng.integers(1, 2**63, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=(num_perm, 1), dtype=np.uint64)
+        self._bands, self._rows = _bands_for(threshold, num_perm)
+        self.reset()
+
+    def reset(self) -> None:
+        self._signatures = np.empty((0, self.num_perm), dtype=np.uint32)
+        self._size = 0
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self._bands)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _shingles(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        if not words:
+            return _EMPTY
+        hashes = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+        n = max(1, len(words) - self.shingle_size + 1)
+        # Combine consecutive word hashes into one 64-bit value per shingle (wrapping arithmetic).
+        shingles = np.zeros(n, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for offset in range(min(self.shingle_size, len(words))):
+                shingles = shingles * np.uint64(1_000_003) + hashes[offset : offset + n]
+        return np.unique(shingles)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (num_perm uint32 values) of `text`."""
+        x = self._shingles(text)[None, :]
+        with np.errstate(over="ignore"):
+            hashed = (self._a * x + self._b) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self._rows : (i + 1) * self._rows].tobytes() for i in range(self._bands)]
+
+    def query(self, signature: np.ndarray) -> List[int]:
+        """Entries whose estimated similarity to `signature` reaches `threshold`, most similar first."""
+        candidates = set()
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(key, ()))
+        if not candidates:
+            return []
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        rows.sort()
+        similarity = (self._signatures[rows] == signature).mean(axis=1)
+        keep = similarity >= self.threshold
+        rows, similarity = rows[keep], similarity[keep]
+        return rows[np.lexsort((rows, -similarity))].tolist()
+
+    def add(self, signature: np.ndarray) -> int:
+        """Append an entry and return its position."""
+        pos = self._size
+        if pos == self._signatures.shape[0]:
+            grown = np.empty((max(1024, 2 * pos), self.num_perm), dtype=np.uint32)
+            grown[:pos] = self._signatures[:pos]
+            self._signatures = grown
+        self._signatures[pos] = signature
+        self._size += 1
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(key, []).append(pos)
+        return pos
+
+    def truncate(self, size: int) -> None:
+        """Forget entries from position `size` on (e.g. chunks whose embedding failed)."""
+        if size < self._size:
+            self._rebuild(self._signatures[:size].copy())
+
+    def compact(self, keep: np.ndarray) -> None:
+        self._rebuild(self._signatures[: self._size][keep[: self._size]])
+
+    def _rebuild(self, signatures: np.ndarray) -> None:
+        self.reset()
+        for signature in signatures:
+            self.add(signature)
+
+    # --------------- Persistence ---------------
+    def config(self) -> Dict[str, Any]:
+        return {
+            "type": self.kind,
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "shingle_size": self.shingle_size,
+            "seed": self.seed,
+        }
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"signatures": self._signatures[: self._size]}
+
+    @classmethod
+    def from_state(cls, config: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> "MinHashLSH":
+        lsh = cls(**{key: value for key, value in config.items() if key != "type"})
+        lsh._rebuild(np.asarray(arrays["signatures"], dtype=np.uint32))
+        return lsh
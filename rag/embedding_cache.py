@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import hashlib
+import sqlite3
+import threading
+
+import numpy as np
+
+from .vector_store import Embedder
+
+
+class CachingEmbedder:
+    """
+    Embedder wrapper that caches vectors by (model, dimension, text hash).
+
+    - An in-process LRU tier holds up to `max_entries` vectors.
+    - An optional SQLite file (`path`) keeps vectors across runs.
+    - Only texts missing from both tiers are sent to the wrapped embedder, deduplicated
+      and in batches of `batch_size`; results always come back in input order.
+    - Cached vectors are stored as float32.
+
+    Example:
+        >>> from rag.vector_store import OpenAIEmbedder, VectorStore
+        >>> embedder = CachingEmbedder(OpenAIEmbedder(), path="embeddings.sqlite")
+        >>> vs = VectorStore(embedder)
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        *,
+        path: Optional[str] = None,
+        max_entries: int = 100_000,
+        batch_size: int = 256,
+        model: Optional[str] = None,
+    ) -> None:
+        if max_entries < 0:
+            raise ValueError("max_entries must be >= 0")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be > 0")
+        self._embedder = embedder
+        self._max_entries = max_entries
+        self._batch_size = batch_size
+        self._model = model or getattr(embedder, "model", None) or embedder.__class__.__name__
+        # Requested dimension is part of the key so shortened and full-size vectors never mix.
+        dimensions = getattr(embedder, "dimensions", None)
+        self._namespace = f"{self._model}\x00{dimensions or 'native'}"
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            self._db.commit()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self._embedder.dimension
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self._namespace}\x00{digest}"
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if self._max_entries == 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        pending: List[str] = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self.memory_hits += 1
+                else:
+                    pending.append(key)
+            if self._db is not None and pending:
+                # SQLite caps bound parameters per statement; query in slices.
+                for start in range(0, len(pending), 500):
+                    part = pending[start : start + 500]
+                    marks = ",".join("?" * len(part))
+                    rows = self._db.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", part)
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        found[key] = vector
+                        self._remember(key, vector)
+                        self.disk_hits += 1
+            self.misses += sum(1 for key in pending if key not in found)
+        return found
+
+    def _store(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            if self._db is not None and items:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in items.items()],
+                )
+                self._db.commit()
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        keys = [self._key(t) for t in texts]
+        unique = list(dict.fromkeys(keys))
+        found = self._lookup(unique)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        miss_keys = list(missing)
+        for start in range(0, len(miss_keys), self._batch_size):
+            batch = miss_keys[start : start + self._batch_size]
+            vectors = self._embedder.embed([missing[k] for k in batch])
+            fresh = {k: np.asarray(v, dtype=np.float32) for k, v in zip(batch, vectors)}
+            self._store(fresh)
+            found.update(fresh)
+        return [found[k].tolist() for k in keys]
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
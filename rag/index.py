@@ -1,29 +1,73 @@
-from pdf_loader import PDFLoader
+import argparse
+import os
 from pathlib import Path
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
-from langchain_qdrant import QdrantVectorStore
+from redis import Redis
 from dotenv import load_dotenv
+from answer_cache import AnswerCache
+from ingest import ingest
+from qdrant_factory import configure, get_client
 
 load_dotenv()
 
-path = Path(__file__).parent / "return_label_uk_2025.pdf"
-
-loader = PDFLoader(file_path=path)
-pages = loader.load_pages()
-
-# chunking
-txt_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=400)
-doc_chunks = txt_splitter.split_documents(pages)
-
 # vector embedding
 model_sm = "text-embedding-3-small"
 model_lg = "text-embedding-3-large"
-embeddings = OpenAIEmbeddings(model=model_lg)
-
-qdrant_client = QdrantVectorStore.from_documents(
-    documents=doc_chunks,
-    embedding=embeddings,
-    url="http://localhost:6333",
-    collection_name="test_collection"
-)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index PDFs into Qdrant")
+    parser.add_argument("paths", nargs="*", default=[str(Path(__file__).parent / "return_label_uk_2025.pdf")],
+                        help="PDF files and/or directories of PDFs")
+    parser.add_argument("--collection", default="test_collection")
+    parser.add_argument("--url", default=None, help="Qdrant url (default: $QDRANT_URL or http://localhost:6333)")
+    parser.add_argument("--grpc", action="store_true", help="send points over gRPC")
+    parser.add_argument("--model", default=model_lg)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=400)
+    parser.add_argument("--batch-size", type=int, default=64, help="chunks per embeddings request")
+    parser.add_argument("--embed-workers", type=int, default=4, help="concurrent embeddings requests")
+    parser.add_argument("--queue-size", type=int, default=8, help="items buffered between stages")
+    parser.add_argument("--pdf-workers", type=int, default=os.cpu_count() or 1,
+                        help="processes extracting PDF text")
+    parser.add_argument("--pdf-cache", default=str(Path(__file__).parent / ".pdf-cache"),
+                        help="extracted page text cache ('' to disable)")
+    parser.add_argument("--checkpoint", default=None,
+                        help="resume log (default: .ingest-<collection>.jsonl next to this script)")
+    parser.add_argument("--dedup", type=float, default=None, metavar="THRESHOLD",
+                        help="collapse near-duplicate chunks at this Jaccard similarity (e.g. 0.9)")
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.url:
+        overrides["url"] = args.url
+    if args.grpc:
+        overrides["prefer_grpc"] = True
+    configure(**overrides)
+    checkpoint = args.checkpoint or str(Path(__file__).parent / f".ingest-{args.collection}.jsonl")
+    stats = ingest(
+        args.paths,
+        OpenAIEmbeddings(model=args.model),
+        get_client(),
+        args.collection,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        batch_size=args.batch_size,
+        embed_workers=args.embed_workers,
+        queue_size=args.queue_size,
+        checkpoint_path=checkpoint,
+        pdf_workers=args.pdf_workers,
+        pdf_cache_dir=args.pdf_cache or None,
+        dedup_threshold=args.dedup,
+        # detector state lives next to the checkpoint so both describe the same collection
+        dedup_state_path=f"{os.path.splitext(checkpoint)[0]}.dedup.npz",
+    )
+    print(stats)
+
+    if stats["batches"]:
+        # cached answers were generated from the previous chunks
+        AnswerCache(Redis(host="localhost", port=6379), namespace=args.collection).invalidate()
+
+
+if __name__ == "__main__":
+    main()
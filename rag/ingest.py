@@ -0,0 +1,386 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from dedup import MinHashLSH
+from pdf_loader import PDFLoader, file_sha256
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Channel:
+    """Bounded queue between two pipeline stages; put/get give up once the pipeline stops."""
+
+    def __init__(self, maxsize, stop):
+        self.items = queue.Queue(maxsize)
+        self.stop = stop
+
+    def put(self, item):
+        while True:
+            try:
+                return self.items.put(item, timeout=0.1)
+            except queue.Full:
+                if self.stop.is_set():
+                    raise Cancelled()
+
+    def get(self):
+        while True:
+            try:
+                return self.items.get(timeout=0.1)
+            except queue.Empty:
+                if self.stop.is_set():
+                    raise Cancelled()
+
+
+_DONE = object()
+
+
+class Checkpoint:
+    """
+    Append-only JSON-lines log of finished batches and files.
+
+    A batch is recorded only after its points are upserted, so a resumed run skips
+    exactly the work that already reached Qdrant. Duplicate references a batch owes to
+    points stored earlier are logged with it until `refs_applied`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.batches = set()
+        self.files = set()
+        self.refs = {}
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from an interrupted write
+                    if "batch" in entry:
+                        self.batches.add(entry["batch"])
+                    if "file" in entry:
+                        self.files.add(entry["file"])
+                    for point_id, refs in entry.get("refs", {}).items():
+                        self.refs.setdefault(point_id, []).extend(refs)
+                    if entry.get("refs_applied"):
+                        self.refs.clear()
+
+    def _append(self, entry):
+        if not self.path:
+            return
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def batch_done(self, batch_id, refs=None):
+        with self.lock:
+            self.batches.add(batch_id)
+            for point_id, ref in refs or ():
+                self.refs.setdefault(point_id, []).append(ref)
+        entry = {"batch": batch_id}
+        if refs:
+            entry["refs"] = {}
+            for point_id, ref in refs:
+                entry["refs"].setdefault(point_id, []).append(ref)
+        self._append(entry)
+
+    def refs_applied(self):
+        self.refs.clear()
+        self._append({"refs_applied": True})
+
+    def file_done(self, file_key, path):
+        self.files.add(file_key)
+        self._append({"file": file_key, "path": str(path)})
+
+
+def find_pdfs(paths):
+    """PDF files from a mix of files and directories (searched recursively), in stable order."""
+    found = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            found.extend(sorted(x for x in p.rglob("*") if x.suffix.lower() == ".pdf" and x.is_file()))
+        else:
+            found.append(p)
+    return found
+
+
+def point_id(file_key, position):
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{file_key}:{position}"))
+
+
+class DuplicateIndex:
+    """
+    MinHash/LSH index over chunks already sent to Qdrant, remembering each one's point id.
+
+    Saved to `path` (if given) so later runs also collapse chunks that duplicate points
+    indexed before.
+    """
+
+    def __init__(self, threshold, path=None):
+        self.path = path
+        self.ids = []
+        if path and os.path.exists(path):
+            with np.load(path) as state:
+                config = {**json.loads(str(state["config"])), "threshold": threshold}
+                self.lsh = MinHashLSH.from_state(config, {"signatures": state["signatures"]})
+                self.ids = state["ids"].tolist()
+        else:
+            self.lsh = MinHashLSH(threshold=threshold)
+
+    def match(self, text, own_id):
+        """Point id of the chunk `text` duplicates, or None after registering it as new."""
+        signature = self.lsh.signature(text)
+        for pos in self.lsh.query(signature):
+            # own_id: the chunk itself, registered by an interrupted earlier run
+            return None if self.ids[pos] == own_id else self.ids[pos]
+        self.lsh.add(signature)
+        self.ids.append(own_id)
+        return None
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, config=np.array(json.dumps(self.lsh.config())), ids=np.array(self.ids, dtype=str),
+                     signatures=self.lsh.arrays()["signatures"])
+        os.replace(tmp, self.path)
+
+
+def ingest(
+    paths,
+    embeddings,
+    client: QdrantClient,
+    collection_name,
+    *,
+    chunk_size=1000,
+    chunk_overlap=400,
+    batch_size=64,
+    embed_workers=4,
+    queue_size=8,
+    checkpoint_path=None,
+    pdf_workers=1,
+    pdf_cache_dir=None,
+    dedup_threshold=None,
+    dedup_state_path=None,
+    log=print,
+):
+    """
+    Index PDFs into Qdrant through overlapping load -> split -> embed -> upsert stages.
+
+    - Stages run in their own threads connected by bounded channels (`queue_size`
+      items each), so memory stays flat however many PDFs are given.
+    - `embed_workers` threads call the embeddings API concurrently.
+    - Point ids are derived from file content and chunk position, so re-running a
+      batch overwrites the same points instead of duplicating them.
+    - With `checkpoint_path`, finished batches and files are recorded and skipped on
+      the next run, so an interrupted ingest resumes without re-embedding.
+    - `pdf_workers` processes share PDF text extraction and `pdf_cache_dir` keeps the
+      extracted pages (see `PDFLoader`).
+    - With `dedup_threshold` (Jaccard similarity, e.g. 0.9) near-duplicate chunks are
+      not embedded; the stored chunk lists them under `metadata["duplicates"]` as
+      {"id", "metadata"} entries. `dedup_state_path` keeps the detector between runs.
+
+    Returns counters: files, skipped_files, batches, skipped_batches, chunks, duplicates.
+    """
+    stop = threading.Event()
+    errors = []
+    stats = {"files": 0, "skipped_files": 0, "batches": 0, "skipped_batches": 0, "chunks": 0, "duplicates": 0}
+    checkpoint = Checkpoint(checkpoint_path)
+    duplicates = DuplicateIndex(dedup_threshold, dedup_state_path) if dedup_threshold else None
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    pages_ch = Channel(queue_size, stop)
+    batches_ch = Channel(queue_size, stop)
+    vectors_ch = Channel(queue_size, stop)
+    # batches still outstanding per file; the file is checkpointed when it reaches zero
+    pending = {}
+    pending_lock = threading.Lock()
+
+    def load():
+        seen = set()
+        for path in find_pdfs(paths):
+            key = f"{file_sha256(path)}:{chunk_size}:{chunk_overlap}"
+            # already indexed, or a byte-identical copy of a file earlier in this run
+            if key in checkpoint.files or key in seen:
+                stats["skipped_files"] += 1
+                continue
+            seen.add(key)
+            loader = PDFLoader(file_path=path, cache_dir=pdf_cache_dir, executor=pdf_pool)
+            pages_ch.put((path, key, loader.load_pages()))
+        pages_ch.put(_DONE)
+
+    def split():
+        while (item := pages_ch.get()) is not _DONE:
+            path, key, pages = item
+            chunks = splitter.split_documents(pages)
+            ids = [point_id(key, i) for i in range(len(chunks))]
+            # batch ids and point ids follow chunk positions, so dropping duplicates keeps them stable;
+            # batch ids name the batch size too, so resuming with another --batch-size redoes the file
+            # instead of skipping chunks that a differently sized batch never covered
+            batch_key = f"{key}:{batch_size}"
+            done = [f"{batch_key}:{i // batch_size}" in checkpoint.batches for i in range(len(chunks))]
+            late_refs = collapse_duplicates(chunks, ids, done) if duplicates else {}
+            todo = []
+            for n in range(0, len(chunks), batch_size):
+                batch_id = f"{batch_key}:{n // batch_size}"
+                if batch_id in checkpoint.batches:
+                    stats["skipped_batches"] += 1
+                    continue
+                batch = [(ids[i], chunks[i]) for i in range(n, min(n + batch_size, len(chunks))) if chunks[i] is not None]
+                refs = [ref for i in range(n, min(n + batch_size, len(chunks))) for ref in late_refs.get(i, ())]
+                todo.append((batch_id, batch, refs))
+            with pending_lock:
+                pending[key] = [len(todo), path]
+            if not todo:
+                finish_file(key)
+            for batch_id, batch, refs in todo:
+                batches_ch.put((key, batch_id, batch, refs))
+        for _ in range(embed_workers):
+            batches_ch.put(_DONE)
+
+    def collapse_duplicates(chunks, ids, done):
+        """
+        Replace near-duplicate chunks with None, recording a reference on the chunk kept.
+
+        References to chunks of this file that are still to be upserted go straight into
+        their metadata; the rest are returned by chunk position and applied after upserting.
+        """
+        position = {point: i for i, point in enumerate(ids)}
+        late_refs = {}
+        for i, doc in enumerate(chunks):
+            original = duplicates.match(doc.page_content, ids[i])
+            if original is None:
+                continue
+            chunks[i] = None
+            ref = {"id": ids[i], "metadata": doc.metadata}
+            j = position.get(original)
+            if j is not None and not done[j]:
+                kept = chunks[j]
+                kept.metadata = {**kept.metadata, "duplicates": [*kept.metadata.get("duplicates", ()), ref]}
+            elif not done[i]:
+                late_refs.setdefault(i, []).append((original, ref))
+            if not done[i]:
+                stats["duplicates"] += 1
+        return late_refs
+
+    def embed():
+        while (item := batches_ch.get()) is not _DONE:
+            key, batch_id, batch, refs = item
+            vectors = embeddings.embed_documents([d.page_content for _, d in batch]) if batch else []
+            vectors_ch.put((key, batch_id, batch, refs, vectors))
+        vectors_ch.put(_DONE)
+
+    def upsert():
+        collection_ready = False
+        finished_workers = 0
+        while finished_workers < embed_workers:
+            item = vectors_ch.get()
+            if item is _DONE:
+                finished_workers += 1
+                continue
+            key, batch_id, batch, refs, vectors = item
+            if batch:
+                if not collection_ready:
+                    ensure_collection(client, collection_name, len(vectors[0]))
+                    collection_ready = True
+                client.upsert(
+                    collection_name=collection_name,
+                    points=[
+                        models.PointStruct(
+                            id=point,
+                            vector=vector,
+                            # same payload layout as langchain_qdrant, so QdrantVectorStore reads it back
+                            payload={"page_content": doc.page_content, "metadata": doc.metadata},
+                        )
+                        for (point, doc), vector in zip(batch, vectors)
+                    ],
+                )
+            checkpoint.batch_done(batch_id, refs)
+            stats["batches"] += 1
+            stats["chunks"] += len(batch)
+            with pending_lock:
+                pending[key][0] -= 1
+                done = pending[key][0] == 0
+            if done:
+                finish_file(key)
+
+    def finish_file(key):
+        with pending_lock:
+            _, path = pending.pop(key)
+            stats["files"] += 1
+        checkpoint.file_done(key, path)
+        log(f"indexed {path}")
+
+    def run(stage):
+        try:
+            stage()
+        except Cancelled:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    threads = [threading.Thread(target=run, args=(stage,), daemon=True) for stage in (load, split, upsert)]
+    threads += [threading.Thread(target=run, args=(embed,), daemon=True) for _ in range(embed_workers)]
+    started = time.perf_counter()
+    pdf_pool = ProcessPoolExecutor(max_workers=pdf_workers) if pdf_workers > 1 else None
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            while t.is_alive():
+                t.join(0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        raise
+    finally:
+        if pdf_pool is not None:
+            pdf_pool.shutdown(cancel_futures=True)
+        if duplicates is not None:
+            duplicates.save()
+    if errors:
+        raise errors[0]
+    if checkpoint.refs:
+        attach_duplicates(client, collection_name, checkpoint.refs)
+        checkpoint.refs_applied()
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def attach_duplicates(client, collection_name, refs, batch_size=256):
+    """Merge duplicate references ({point id: [ref, ...]}) into the metadata of stored points."""
+    point_ids = list(refs)
+    for n in range(0, len(point_ids), batch_size):
+        points = client.retrieve(collection_name, ids=point_ids[n : n + batch_size], with_payload=["metadata"])
+        for point in points:
+            metadata = (point.payload or {}).get("metadata") or {}
+            merged = list(metadata.get("duplicates", []))
+            known = {ref["id"] for ref in merged}
+            for ref in refs[str(point.id)]:
+                if ref["id"] not in known:
+                    known.add(ref["id"])
+                    merged.append(ref)
+            client.set_payload(collection_name, payload={"duplicates": merged}, points=[point.id], key="metadata")
+
+
+def ensure_collection(client, collection_name, dimension):
+    # same settings langchain_qdrant uses when it creates a collection
+    if not client.collection_exists(collection_name):
+        client.create_collection(
+            collection_name=collection_name,
+            vectors_config=models.VectorParams(size=dimension, distance=models.Distance.COSINE),
+        )
@@ -0,0 +1,77 @@
+import json
+import time
+import uuid
+
+
+class MicroBatcher:
+    """
+    Groups the retrieval step of concurrently running RQ jobs into one batch.
+
+    Every job pushes its query onto a shared Redis list. Whichever job first takes the
+    leader lock waits until `max_batch` queries are pending or `max_wait_ms` has passed.
+    It then takes the batch and runs `retrieve_batch` once for all of them: one
+    embeddings call plus one Qdrant batch search. Each job gets its own result back and
+    continues with its completion, so the completions still run concurrently across
+    worker processes.
+
+    If no result arrives within `timeout` seconds (e.g. a leader crashed), the job
+    retrieves on its own, so a job is never lost because of batching.
+    """
+
+    def __init__(self, redis, retrieve_batch, *, max_batch=16, max_wait_ms=20, timeout=30.0,
+                 prefix="rag:batch"):
+        if max_batch <= 0:
+            raise ValueError("max_batch must be > 0")
+        self.redis = redis
+        self.retrieve_batch = retrieve_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self.pending_key = f"{prefix}:pending"
+        self.leader_key = f"{prefix}:leader"
+        self.result_prefix = f"{prefix}:result"
+
+    def submit(self, q: str):
+        """Result of `retrieve_batch` for `q`, computed together with other pending queries."""
+        token = uuid.uuid4().hex
+        result_key = f"{self.result_prefix}:{token}"
+        self.redis.rpush(self.pending_key, json.dumps({"token": token, "q": q}))
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            if self.redis.set(self.leader_key, token, nx=True, px=int(self.max_wait * 2000) + 1000):
+                self._lead(token)
+            item = self.redis.blpop(result_key, timeout=max(self.max_wait, 0.01))
+            if item is not None:
+                self.redis.delete(result_key)
+                payload = json.loads(item[1])
+                if "error" not in payload:
+                    return payload["result"]
+                break
+        # batch failed or timed out: do it alone
+        return self.retrieve_batch([q])[0]
+
+    def _lead(self, token: str):
+        deadline = time.monotonic() + self.max_wait
+        while time.monotonic() < deadline and self.redis.llen(self.pending_key) < self.max_batch:
+            time.sleep(0.002)
+        pipe = self.redis.pipeline()
+        pipe.lrange(self.pending_key, 0, self.max_batch - 1)
+        pipe.ltrim(self.pending_key, self.max_batch, -1)
+        items, _ = pipe.execute()
+        # let the next batch form while this one is being retrieved
+        if self.redis.get(self.leader_key) in (token, token.encode()):
+            self.redis.delete(self.leader_key)
+        if not items:
+            return
+        members = [json.loads(i) for i in items]
+        try:
+            results = self.retrieve_batch([m["q"] for m in members])
+            payloads = [{"result": r} for r in results]
+        except Exception as e:
+            payloads = [{"error": str(e)}] * len(members)
+        pipe = self.redis.pipeline(transaction=False)
+        for member, payload in zip(members, payloads):
+            key = f"{self.result_prefix}:{member['token']}"
+            pipe.rpush(key, json.dumps(payload))
+            pipe.expire(key, int(self.timeout) + 60)
+        pipe.execute()
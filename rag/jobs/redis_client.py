@@ -0,0 +1,28 @@
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from rq import Queue
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
+
+redis_conn = Redis(
+    host="localhost", port=6379
+)
+# for code running on the server's event loop (SSE streams), so it never holds a thread
+async_redis_conn = AsyncRedis(host="localhost", port=6379)
+
+# priority lanes with their maximum queued jobs; run `rq worker interactive batch`
+# so workers always drain interactive jobs before batch ones
+QUEUE_MAX_DEPTH = {"interactive": 200, "batch": 5000}
+
+queues = {
+    name: Queue(name, connection=redis_conn) for name in QUEUE_MAX_DEPTH
+}
+queue = queues["interactive"]
+
+
+def fetch_job(job_id: str):
+    # Queue.fetch_job only finds jobs of that queue; look the job up in any lane
+    try:
+        return Job.fetch(job_id, connection=redis_conn)
+    except NoSuchJobError:
+        return None
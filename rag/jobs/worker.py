@@ -0,0 +1,115 @@
+from openai import OpenAI
+from rq import get_current_job
+from dotenv import load_dotenv
+from langchain_openai import OpenAIEmbeddings
+from qdrant_client import models
+from answer_cache import AnswerCache
+from jobs.batching import MicroBatcher
+from jobs.redis_client import redis_conn
+from qdrant_factory import get_vector_store
+# rq worker command: rq worker interactive batch
+# (add `-w rq.worker.SimpleWorker` to run jobs in the worker process itself, so the pooled
+# Qdrant client and the batcher live across jobs instead of one forked work horse per job)
+load_dotenv()
+
+COLLECTION_NAME = "test_collection"
+EMBEDDING_MODEL = "text-embedding-3-large"
+CHAT_MODEL = "gpt-4o-mini"
+
+client = OpenAI()
+embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL)
+# near-identical questions reuse an earlier answer instead of calling the LLM
+answer_cache = AnswerCache(redis_conn, namespace=COLLECTION_NAME, threshold=0.95, ttl=24 * 3600, max_entries=2000)
+
+# tokens of each job are appended to a Redis stream so clients can replay them from the start
+STREAM_TTL = 3600
+
+
+def stream_key(job_id: str) -> str:
+    return f"rag:stream:{job_id}"
+
+
+def publish(job_id, event: str, data: str = ""):
+    if job_id is None:
+        return
+    key = stream_key(job_id)
+    pipe = redis_conn.pipeline(transaction=False)
+    pipe.xadd(key, {"event": event, "data": data})
+    pipe.expire(key, STREAM_TTL)
+    pipe.execute()
+
+
+def build_messages(q: str, context: str):
+    SYSTEM_PROMPT = f"""You are a helpful assistant who can answer questions about the following documents with context.
+        CONTEXT:
+        {context}
+    """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": q}
+    ]
+
+
+def retrieve_batch(queries):
+    # one embeddings request and one Qdrant batch search for all queries
+    vectors = embeddings.embed_documents(list(queries))
+    # shared pooled client, configured through QDRANT_* environment variables (see qdrant_factory)
+    db = get_vector_store(COLLECTION_NAME, embeddings)
+    responses = db.client.query_batch_points(
+        collection_name=COLLECTION_NAME,
+        requests=[
+            models.QueryRequest(query=v, using=db.vector_name or None, limit=3, with_payload=True)
+            for v in vectors
+        ],
+    )
+    results = []
+    for vector, response in zip(vectors, responses):
+        # context string from results
+        context = "\n\n\n".join([(p.payload or {}).get(db.content_payload_key, "") for p in response.points])
+        results.append([vector, context])
+    return results
+
+
+# concurrent jobs (one per worker process) share the retrieval step: up to 16 queries or 20 ms
+batcher = MicroBatcher(redis_conn, retrieve_batch, max_batch=16, max_wait_ms=20)
+
+
+def process_query(q: str):
+    print(f"Processing query: {q}")
+    job = get_current_job()
+    job_id = job.id if job else None
+    try:
+        answer = answer_query(q, job_id)
+    except Exception as e:
+        publish(job_id, "error", str(e))
+        raise
+    publish(job_id, "done")
+    return answer
+
+
+def answer_query(q: str, job_id=None):
+    # the vector is both the cache key and the Qdrant query
+    vector, context = batcher.submit(q)
+    cached = answer_cache.lookup(vector)
+    if cached is not None:
+        publish(job_id, "token", cached)
+        return cached
+
+    stream = client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=build_messages(q, context),
+        stream=True
+    )
+    # forward tokens as they arrive; the full answer is still the job's return value
+    parts = []
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        token = chunk.choices[0].delta.content
+        if token:
+            parts.append(token)
+            publish(job_id, "token", token)
+    answer = "".join(parts)
+    if answer:
+        answer_cache.store(q, vector, answer)
+    return answer
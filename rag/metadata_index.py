@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+_RANGE_OPS = {"$gt", "$gte", "$lt", "$lte"}
+_ALL_OPS = _RANGE_OPS | {"$eq", "$in"}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class MetadataIndex:
+    """
+    Inverted index over `Document.metadata` for pre-filtered search.
+
+    - Every hashable metadata value maps to the rows holding it; list values index
+      each element, so `{"tags": "faq"}` matches `tags=["faq", "billing"]`.
+    - Numeric values are also kept in per-key columns for range predicates.
+
+    Filters are dicts combined with AND across keys:
+        {"source": "a.pdf"}                     equality
+        {"source": {"$in": ["a.pdf", "b.pdf"]}} membership
+        {"page": {"$gte": 2, "$lt": 10}}        numeric range ($gt, $gte, $lt, $lte)
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._postings: Dict[str, Dict[Any, array]] = {}
+        self._numeric: Dict[str, Tuple[array, array]] = {}
+
+    def add(self, metadatas: Iterable[Mapping[str, Any]], start: int) -> None:
+        """Index metadata for consecutive rows beginning at `start`."""
+        for row, meta in enumerate(metadatas, start):
+            for key, value in meta.items():
+                values = value if isinstance(value, (list, tuple, set, frozenset)) else (value,)
+                for v in values:
+                    try:
+                        postings = self._postings.setdefault(key, {}).setdefault(v, array("q"))
+                    except TypeError:
+                        continue  # unhashable values (e.g. nested dicts) are not indexed
+                    postings.append(row)
+                    if _is_number(v):
+                        rows, nums = self._numeric.setdefault(key, (array("q"), array("d")))
+                        rows.append(row)
+                        nums.append(float(v))
+
+    def match(self, filter: Mapping[str, Any]) -> np.ndarray:
+        """Sorted, unique row ids satisfying every predicate in `filter`."""
+        result: Optional[np.ndarray] = None
+        for key, cond in filter.items():
+            rows = self._match_key(key, cond)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+            if result.size == 0:
+                break
+        if result is None:
+            raise ValueError("filter must contain at least one predicate")
+        return result
+
+    def _rows(self, key: str, value: Any) -> np.ndarray:
+        try:
+            postings = self._postings.get(key, {}).get(value)
+        except TypeError:
+            raise ValueError(f"filter value for {key!r} must be hashable") from None
+        if postings is None:
+            return np.empty(0, dtype=np.int64)
+        return np.frombuffer(postings, dtype=np.int64)
+
+    def _match_key(self, key: str, cond: Any) -> np.ndarray:
+        if not isinstance(cond, Mapping):
+            return np.unique(self._rows(key, cond))
+        unknown = set(cond) - _ALL_OPS
+        if unknown:
+            raise ValueError(f"Unsupported filter operators for {key!r}: {sorted(unknown)}")
+        parts: List[np.ndarray] = []
+        if "$eq" in cond:
+            parts.append(np.unique(self._rows(key, cond["$eq"])))
+        if "$in" in cond:
+            options = [self._rows(key, v) for v in cond["$in"]]
+            parts.append(np.unique(np.concatenate(options)) if options else np.empty(0, dtype=np.int64))
+        ranges = {op: cond[op] for op in _RANGE_OPS if op in cond}
+        if ranges:
+            parts.append(self._match_range(key, ranges))
+        result = parts[0]
+        for rows in parts[1:]:
+            result = np.intersect1d(result, rows, assume_unique=True)
+        return result
+
+    def _match_range(self, key: str, ranges: Dict[str, Any]) -> np.ndarray:
+        for op, bound in ranges.items():
+            if not _is_number(bound):
+                raise ValueError(f"{op} on {key!r} needs a numeric bound, got {bound!r}")
+        if key not in self._numeric:
+            return np.empty(0, dtype=np.int64)
+        rows_buf, nums_buf = self._numeric[key]
+        rows = np.frombuffer(rows_buf, dtype=np.int64)
+        nums = np.frombuffer(nums_buf, dtype=np.float64)
+        mask = np.ones(nums.shape[0], dtype=bool)
+        if "$gt" in ranges:
+            mask &= nums > ranges["$gt"]
+        if "$gte" in ranges:
+            mask &= nums >= ranges["$gte"]
+        if "$lt" in ranges:
+            mask &= nums < ranges["$lt"]
+        if "$lte" in ranges:
+            mask &= nums <= ranges["$lte"]
+        return np.unique(rows[mask])
@@ -1,11 +1,163 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
 from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
 from pathlib import Path
+from pypdf import PdfReader
+import hashlib
+import json
+import os
+
+
+def extract_pages(file_path, start, stop):
+    # runs in worker processes: plain-text extraction of pages [start, stop), like PyPDFLoader
+    reader = PdfReader(file_path)
+    return [reader.pages[n].extract_text(extraction_mode="plain").strip() for n in range(start, stop)]
+
+
+def pdf_info(metadata):
+    """Document info the way PyPDFLoader reports it: lowercase keys, ISO dates, PyPDF defaults."""
+    info = {}
+    for k, v in ({"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""} | dict(metadata or {})).items():
+        k = k.lstrip("/").lower()
+        v = v if isinstance(v, (str, int)) else str(v)
+        if k in ("creationdate", "moddate"):
+            # raw PDF dates look like "D:20220118110050+01'00'"
+            try:
+                v = datetime.strptime(v.replace("'", ""), "D:%Y%m%d%H%M%S%z").isoformat("T")
+            except ValueError:
+                pass
+        elif isinstance(v, str):
+            v = v.strip()
+        info[k] = v
+    return info
+
+
+def file_sha256(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class PageCache:
+    """
+    Extracted page text on disk, keyed by file content hash and page number.
+
+    Layout: <root>/<sha256>/meta.json (document metadata, page labels) and
+    <root>/<sha256>/<page>.txt. A changed file has a new hash, so stale text is never read.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _dir(self, file_hash):
+        return self.root / file_hash
+
+    def _write(self, path, text):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def get_meta(self, file_hash):
+        path = self._dir(file_hash) / "meta.json"
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+    def put_meta(self, file_hash, meta):
+        self._write(self._dir(file_hash) / "meta.json", json.dumps(meta))
+
+    def has(self, file_hash, page):
+        return (self._dir(file_hash) / f"{page}.txt").exists()
+
+    def get(self, file_hash, page):
+        return (self._dir(file_hash) / f"{page}.txt").read_text(encoding="utf-8")
+
+    def put(self, file_hash, page, text):
+        self._write(self._dir(file_hash) / f"{page}.txt", text)
 
 
 class PDFLoader:
-    def __init__(self, file_path: str | Path):
+    """
+    Page-per-Document PDF loader.
+
+    - Without `cache_dir` or workers this is `PyPDFLoader`, unchanged.
+    - `cache_dir` stores extracted text per (file hash, page); unchanged files are not parsed again.
+    - `workers > 1` (or a shared `executor`) extracts page ranges of `pages_per_task` pages
+      in a process pool; pages are still yielded in order.
+    """
+
+    def __init__(self, file_path: str | Path, *, cache_dir=None, workers=1, executor: Executor = None,
+                 pages_per_task=8):
+        self.file_path = str(file_path)
         self.loader = PyPDFLoader(file_path)
+        self.cache = PageCache(cache_dir) if cache_dir else None
+        self.workers = workers
+        self.executor = executor
+        self.pages_per_task = pages_per_task
 
     def load_pages(self):
         # load , returns a list of Document pages
-        return self.loader.load()
+        return list(self.lazy_load())
+
+    def lazy_load(self):
+        """Yield one Document per page as soon as it has been extracted (or read from the cache)."""
+        if self.cache is None and self.executor is None and self.workers <= 1:
+            yield from self.loader.lazy_load()
+            return
+
+        file_hash = file_sha256(self.file_path)
+        meta = self.cache.get_meta(file_hash) if self.cache else None
+        if meta is not None:
+            # caches written before dates were converted hold the raw PDF strings
+            meta["metadata"] = pdf_info(meta["metadata"])
+        else:
+            meta = self._read_meta()
+            if self.cache:
+                self.cache.put_meta(file_hash, meta)
+        total = meta["total_pages"]
+        missing = [n for n in range(total) if not (self.cache and self.cache.has(file_hash, n))]
+
+        def page(n, text):
+            if self.cache and n in missing_set:
+                self.cache.put(file_hash, n, text)
+            metadata = {**meta["metadata"], "source": self.file_path, "total_pages": total,
+                        "page": n, "page_label": meta["page_labels"][n]}
+            return Document(page_content=text, metadata=metadata)
+
+        missing_set = set(missing)
+        extracted = self._extract(missing)
+        for n in range(total):
+            text = next(extracted) if n in missing_set else self.cache.get(file_hash, n)
+            yield page(n, text)
+
+    def _read_meta(self):
+        reader = PdfReader(self.file_path)
+        return {"metadata": pdf_info(reader.metadata), "page_labels": list(reader.page_labels), "total_pages": len(reader.pages)}
+
+    def _extract(self, pages):
+        """Texts of `pages` (ascending) in order, extracted lazily or by the process pool."""
+        if not pages:
+            return
+        if self.executor is None and self.workers <= 1:
+            reader = PdfReader(self.file_path)
+            for n in pages:
+                yield reader.pages[n].extract_text(extraction_mode="plain").strip()
+            return
+
+        # contiguous runs of missing pages, cut into tasks of at most pages_per_task pages
+        ranges = []
+        for n in pages:
+            if ranges and ranges[-1][1] == n and n - ranges[-1][0] < self.pages_per_task:
+                ranges[-1][1] = n + 1
+            else:
+                ranges.append([n, n + 1])
+        pool = self.executor or ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            futures = [pool.submit(extract_pages, self.file_path, start, stop) for start, stop in ranges]
+            for future in futures:
+                yield from future.result()
+        finally:
+            if pool is not self.executor:
+                pool.shutdown(cancel_futures=True)
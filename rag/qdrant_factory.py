@@ -0,0 +1,115 @@
+import os
+import threading
+from dataclasses import dataclass, replace
+
+import httpx
+from langchain_qdrant import QdrantVectorStore
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+
+@dataclass(frozen=True)
+class QdrantSettings:
+    """
+    Connection settings shared by index.py, retrieve.py, the worker and the server.
+
+    `url=":memory:"` uses qdrant-client's in-process local mode (no server; for tests).
+    Note the sync and async clients then hold separate in-memory databases.
+    """
+
+    url: str = "http://localhost:6333"
+    api_key: str | None = None
+    # gRPC for points traffic (search/upsert); collection management still goes over REST
+    prefer_grpc: bool = False
+    grpc_port: int = 6334
+    timeout: int = 10  # seconds per request
+    max_connections: int = 32  # pooled REST connections per client
+    max_keepalive: int = 16  # idle REST connections kept open between requests
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        return cls(
+            url=env.get("QDRANT_URL", cls.url),
+            api_key=env.get("QDRANT_API_KEY") or None,
+            prefer_grpc=env.get("QDRANT_PREFER_GRPC", "").lower() in ("1", "true", "yes"),
+            grpc_port=int(env.get("QDRANT_GRPC_PORT", cls.grpc_port)),
+            timeout=int(env.get("QDRANT_TIMEOUT", cls.timeout)),
+            max_connections=int(env.get("QDRANT_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive=int(env.get("QDRANT_MAX_KEEPALIVE", cls.max_keepalive)),
+        )
+
+    def client_kwargs(self):
+        if self.url == ":memory:":
+            return {"location": ":memory:"}
+        return {
+            "url": self.url,
+            "api_key": self.api_key,
+            "prefer_grpc": self.prefer_grpc,
+            "grpc_port": self.grpc_port,
+            "timeout": self.timeout,
+            "limits": httpx.Limits(max_connections=self.max_connections,
+                                   max_keepalive_connections=self.max_keepalive),
+        }
+
+
+_settings = QdrantSettings.from_env()
+# one object of each kind per process: {kind: (pid, object)}
+_clients = {}
+_lock = threading.RLock()
+
+
+def configure(**overrides):
+    """Change settings (e.g. configure(url=":memory:") in tests); clients are rebuilt on next use."""
+    global _settings
+    with _lock:
+        _settings = replace(_settings, **overrides)
+        _clients.clear()
+    return _settings
+
+
+def settings():
+    return _settings
+
+
+def _get(kind, build):
+    pid = os.getpid()
+    entry = _clients.get(kind)
+    # a forked child (e.g. an rq work horse) must not share the parent's sockets
+    if entry is None or entry[0] != pid:
+        with _lock:
+            entry = _clients.get(kind)
+            if entry is None or entry[0] != pid:
+                entry = _clients[kind] = (pid, build())
+    return entry[1]
+
+
+def get_client() -> QdrantClient:
+    """The process-wide pooled QdrantClient."""
+    return _get("sync", lambda: QdrantClient(**_settings.client_kwargs()))
+
+
+def get_async_client() -> AsyncQdrantClient:
+    """The process-wide pooled AsyncQdrantClient (use it from a single event loop)."""
+    return _get("async", lambda: AsyncQdrantClient(**_settings.client_kwargs()))
+
+
+def get_vector_store(collection_name, embedding) -> QdrantVectorStore:
+    """
+    QdrantVectorStore over an existing collection, backed by the shared client.
+
+    Cached per process and collection; call it where the store is used rather than
+    keeping the result at import time, so forked processes get their own connections.
+    """
+    return _get(("store", collection_name),
+                lambda: QdrantVectorStore(client=get_client(), collection_name=collection_name, embedding=embedding))
+
+
+async def aclose_clients():
+    """Close this process's clients (server shutdown)."""
+    with _lock:
+        entries = [client for kind, (pid, client) in _clients.items() if kind in ("sync", "async") and pid == os.getpid()]
+        _clients.clear()
+    for client in entries:
+        result = client.close()
+        if hasattr(result, "__await__"):
+            await result
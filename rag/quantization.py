@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Protocol, Type
+
+import numpy as np
+
+# Rows converted back to float32 at a time while scoring, bounding temporary memory.
+_BLOCK_ROWS = 16384
+
+
+class Quantizer(Protocol):
+    """
+    Protocol for compressed copies of the store's normalized embeddings.
+
+    A quantizer keeps its own codes for every stored row (appended in order) and
+    returns approximate inner-product scores from them.
+    """
+
+    kind: str
+
+    def add(self, block: np.ndarray) -> None:  # pragma: no cover - protocol
+        """Append codes for normalized float32 rows."""
+        ...
+
+    def scores(self, queries: np.ndarray, n_rows: int) -> np.ndarray:  # pragma: no cover - protocol
+        """Approximate (n_queries, n_rows) scores against the first `n_rows` rows."""
+        ...
+
+    def compact(self, keep: np.ndarray) -> None:  # pragma: no cover - protocol
+        ...
+
+    def reset(self) -> None:  # pragma: no cover - protocol
+        ...
+
+    @property
+    def nbytes(self) -> int:  # pragma: no cover - protocol
+        ...
+
+    def config(self) -> Dict[str, Any]:  # pragma: no cover - protocol
+        ...
+
+    def arrays(self) -> Dict[str, np.ndarray]:  # pragma: no cover - protocol
+        ...
+
+
+class _CodeBuffer:
+    """Growable row buffer shared by the quantizers."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._codes: Optional[np.ndarray] = None
+        self._extra: Optional[np.ndarray] = None
+        self._size = 0
+
+    def _append(self, codes: np.ndarray, extra: Optional[np.ndarray] = None) -> None:
+        needed = self._size + codes.shape[0]
+        if self._codes is None or needed > self._codes.shape[0]:
+            capacity = max(needed, 2 * (0 if self._codes is None else self._codes.shape[0]), 1024)
+            grown = np.empty((capacity,) + codes.shape[1:], dtype=codes.dtype)
+            if self._codes is not None:
+                grown[: self._size] = self._codes[: self._size]
+            self._codes = grown
+            if extra is not None:
+                grown_extra = np.empty(capacity, dtype=extra.dtype)
+                if self._extra is not None:
+                    grown_extra[: self._size] = self._extra[: self._size]
+                self._extra = grown_extra
+        self._codes[self._size : needed] = codes
+        if extra is not None:
+            self._extra[self._size : needed] = extra  # type: ignore[index]
+        self._size = needed
+
+    def compact(self, keep: np.ndarray) -> None:
+        if self._codes is None:
+            return
+        self._codes = self._codes[: self._size][keep]
+        if self._extra is not None:
+            self._extra = self._extra[: self._size][keep]
+        self._size = self._codes.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        if self._codes is None:
+            return 0
+        row = self._codes[:1].nbytes + (0 if self._extra is None else self._extra[:1].nbytes)
+        return row * self._size
+
+    def config(self) -> Dict[str, Any]:
+        return {"type": self.kind}  # type: ignore[attr-defined]
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        if self._codes is None:
+            return {}
+        out = {"codes": self._codes[: self._size]}
+        if self._extra is not None:
+            out["extra"] = self._extra[: self._size]
+        return out
+
+    @classmethod
+    def from_state(cls, config: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> "_CodeBuffer":
+        q = cls()
+        if "codes" in arrays:
+            q._codes = np.array(arrays["codes"])
+            q._extra = np.array(arrays["extra"]) if "extra" in arrays else None
+            q._size = q._codes.shape[0]
+        return q
+
+
+class Float16Quantizer(_CodeBuffer):
+    """Half-precision copy of each row (2x smaller than float32, near-lossless)."""
+
+    kind = "float16"
+
+    def add(self, block: np.ndarray) -> None:
+        self._append(block.astype(np.float16))
+
+    def scores(self, queries: np.ndarray, n_rows: int) -> np.ndarray:
+        out = np.empty((queries.shape[0], n_rows), dtype=np.float32)
+        for start in range(0, n_rows, _BLOCK_ROWS):
+            block = self._codes[start : min(n_rows, start + _BLOCK_ROWS)].astype(np.float32)  # type: ignore[index]
+            out[:, start : start + block.shape[0]] = queries @ block.T
+        return out
+
+
+class Int8Quantizer(_CodeBuffer):
+    """
+    Symmetric int8 scalar quantization with one float32 scale per row (~4x smaller).
+
+    Each row is divided by its largest absolute component and mapped onto [-127, 127].
+    """
+
+    kind = "int8"
+
+    def add(self, block: np.ndarray) -> None:
+        scale = np.abs(block).max(axis=1)
+        safe = np.where(scale > 0, scale, 1.0)
+        codes = np.rint(block / safe[:, None] * 127).astype(np.int8)
+        self._append(codes, (scale / 127).astype(np.float32))
+
+    def scores(self, queries: np.ndarray, n_rows: int) -> np.ndarray:
+        out = np.empty((queries.shape[0], n_rows), dtype=np.float32)
+        for start in range(0, n_rows, _BLOCK_ROWS):
+            end = min(n_rows, start + _BLOCK_ROWS)
+            block = self._codes[start:end].astype(np.float32)  # type: ignore[index]
+            out[:, start:end] = (queries @ block.T) * self._extra[start:end]  # type: ignore[index]
+        return out
+
+
+class BinaryQuantizer(_CodeBuffer):
+    """
+    1-bit sign quantization packed 8 dimensions per byte (32x smaller).
+
+    Scores are 1 - 2 * hamming / dim, a coarse estimate meant to be rescored.
+    """
+
+    kind = "binary"
+
+    def add(self, block: np.ndarray) -> None:
+        self._append(np.packbits(block > 0, axis=1))
+
+    def scores(self, queries: np.ndarray, n_rows: int) -> np.ndarray:
+        dim = queries.shape[1]
+        packed = np.packbits(queries > 0, axis=1)
+        out = np.empty((queries.shape[0], n_rows), dtype=np.float32)
+        for start in range(0, n_rows, _BLOCK_ROWS):
+            end = min(n_rows, start + _BLOCK_ROWS)
+            block = self._codes[start:end]  # type: ignore[index]
+            for i, qbits in enumerate(packed):
+                hamming = np.bitwise_count(block ^ qbits).sum(axis=1, dtype=np.int32)
+                out[i, start:end] = 1.0 - 2.0 * hamming / dim
+        return out
+
+
+_QUANTIZER_TYPES: Dict[str, Type[Any]] = {
+    Float16Quantizer.kind: Float16Quantizer,
+    Int8Quantizer.kind: Int8Quantizer,
+    BinaryQuantizer.kind: BinaryQuantizer,
+}
+
+
+def make_quantizer(kind: str) -> Quantizer:
+    """Create an empty quantizer by name: "float16", "int8" or "binary"."""
+    if kind not in _QUANTIZER_TYPES:
+        raise ValueError(f"Unsupported quantization: {kind}")
+    return _QUANTIZER_TYPES[kind]()
+
+
+def load_quantizer(config: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> Quantizer:
+    """Rebuild a quantizer from the `config()` / `arrays()` pair written by `VectorStore.save`."""
+    kind = config.get("type")
+    if kind not in _QUANTIZER_TYPES:
+        raise ValueError(f"Unsupported quantization: {kind}")
+    return _QUANTIZER_TYPES[kind].from_state(config, arrays)
@@ -1,10 +0,0 @@
-from redis import Redis
-from rq import Queue
-
-queue = Queue(
-    connection=Redis(
-        host="localhost", port=6379
-    )
-)
-
-
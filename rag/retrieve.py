@@ -1,5 +1,5 @@
 from langchain_openai import OpenAIEmbeddings
-from langchain_qdrant import QdrantVectorStore
+from qdrant_factory import get_vector_store
 from dotenv import load_dotenv
 from openai import OpenAI
 load_dotenv()
@@ -9,11 +9,7 @@ model_sm = "text-embedding-3-small"
 model_lg = "text-embedding-3-large"
 embeddings = OpenAIEmbeddings(model=model_lg)
 
-vector_db = QdrantVectorStore.from_existing_collection(
-    url="http://localhost:6333",
-    collection_name="test_collection",
-    embedding=embeddings
-)
+vector_db = get_vector_store("test_collection", embeddings)
 
 user_query = input("Enter your query: ")
 
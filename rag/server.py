@@ -1,11 +1,36 @@
 from dotenv import load_dotenv
 
 load_dotenv()
-from fastapi import FastAPI, Query
-from queue.redis_client import queue
-from queue.worker import process_query
+import asyncio
+import json
+import math
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Literal
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from rq.job import JobStatus
+from jobs.redis_client import QUEUE_MAX_DEPTH, async_redis_conn, fetch_job, queues, redis_conn
+from jobs.worker import answer_cache, process_query, stream_key
+from async_rag import answer_query_async
+from qdrant_factory import aclose_clients
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # pooled Qdrant connections are reused by every request until shutdown
+    await aclose_clients()
+    await async_redis_conn.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# /chat/sync answers in-process up to this many requests at once, then falls back to RQ
+SYNC_MAX_IN_FLIGHT = 32
+# how long a fallback request waits for its RQ job before returning the job id instead
+SYNC_QUEUE_TIMEOUT = 60
+sync_in_flight = 0
 
 
 @app.get("/")
@@ -13,12 +38,127 @@ def root():
     return {"message": "Hello World"}
 
 
+def queue_state(lane: str):
+    q = queues[lane]
+    depth = q.count
+    oldest_wait = 0.0
+    head = q.get_job_ids(0, 1)
+    job = fetch_job(head[0]) if head else None
+    if job is not None and job.enqueued_at is not None:
+        enqueued_at = job.enqueued_at
+        if enqueued_at.tzinfo is None:
+            enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+        oldest_wait = max(0.0, (datetime.now(timezone.utc) - enqueued_at).total_seconds())
+    return {
+        "depth": depth,
+        "max_depth": QUEUE_MAX_DEPTH[lane],
+        "running": q.started_job_registry.count,
+        "oldest_wait_seconds": round(oldest_wait, 3),
+        "accepting": depth < QUEUE_MAX_DEPTH[lane],
+    }
+
+
+def enqueue(lane: str, q: str):
+    # admission control: reject instead of letting the lane grow without bound
+    state = queue_state(lane)
+    if not state["accepting"]:
+        # the head of the lane has waited this long; a new job would wait at least as long
+        retry_after = min(60, max(1, math.ceil(state["oldest_wait_seconds"])))
+        raise HTTPException(
+            status_code=429,
+            detail=f"{lane} queue is full",
+            headers={"Retry-After": str(retry_after)},
+        )
+    return queues[lane].enqueue(process_query, q)
+
+
 @app.post("/chat")
-def chat(q: str = Query(..., description="user query")):
-    job = queue.enqueue(process_query, q)
-    return {"job_id": job.id, "status": "queued"}
+def chat(
+    q: str = Query(..., description="user query"),
+    priority: Literal["interactive", "batch"] = Query("interactive", description="queue lane"),
+):
+    job = enqueue(priority, q)
+    return {"job_id": job.id, "status": "queued", "priority": priority, "stream_url": f"/chat/{job.id}/stream"}
 
 @app.get("/results/{job_id}")
 def get_results(job_id: str):
-    job = queue.fetch_job(job_id)
-    return job.return_value()
\ No newline at end of file
+    job = fetch_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job.return_value()
+
+
+@app.get("/queue/stats")
+def queue_stats():
+    # depth and head-of-line wait per lane, for load balancers to shed load early
+    return {lane: queue_state(lane) for lane in queues}
+
+
+@app.post("/chat/sync")
+async def chat_sync(q: str = Query(..., description="user query")):
+    global sync_in_flight
+    if sync_in_flight < SYNC_MAX_IN_FLIGHT:
+        # single event loop: the check and increment cannot interleave with another request
+        sync_in_flight += 1
+        try:
+            return {"answer": await answer_query_async(q), "path": "inline"}
+        finally:
+            sync_in_flight -= 1
+
+    job = await asyncio.to_thread(enqueue, "interactive", q)
+    deadline = asyncio.get_running_loop().time() + SYNC_QUEUE_TIMEOUT
+    while asyncio.get_running_loop().time() < deadline:
+        status = await asyncio.to_thread(job.get_status)
+        if status == JobStatus.FINISHED:
+            answer = await asyncio.to_thread(job.return_value)
+            return {"answer": answer, "path": "queue", "job_id": job.id}
+        if status in (JobStatus.FAILED, JobStatus.STOPPED, JobStatus.CANCELED):
+            raise HTTPException(status_code=502, detail=f"job {job.id} {status}")
+        await asyncio.sleep(0.1)
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": "queued", "stream_url": f"/chat/{job.id}/stream"},
+    )
+
+
+async def sse_events(job_id: str):
+    # async: an open stream waits on the event loop, not on one of the threadpool threads
+    # that sync routes share; a disconnect cancels the pending XREAD right away
+    key = stream_key(job_id)
+    last_id = "0"
+    while True:
+        entries = await async_redis_conn.xread({key: last_id}, count=100, block=15000)
+        if not entries:
+            job = await asyncio.to_thread(fetch_job, job_id)
+            if job is None or job.is_failed:
+                yield f"event: error\ndata: {json.dumps('job failed or expired')}\n\n"
+                return
+            # comment line keeps proxies from closing an idle connection
+            yield ": keep-alive\n\n"
+            continue
+        for _, messages in entries:
+            for msg_id, fields in messages:
+                last_id = msg_id
+                event = fields[b"event"].decode()
+                data = fields.get(b"data", b"").decode()
+                # JSON-encode so tokens containing newlines stay one SSE data line
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                if event in ("done", "error"):
+                    return
+
+
+@app.get("/chat/{job_id}/stream")
+async def stream_chat(job_id: str):
+    if await asyncio.to_thread(fetch_job, job_id) is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return StreamingResponse(
+        sse_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    # hit rate of the semantic answer cache, shared by all workers
+    return answer_cache.stats()
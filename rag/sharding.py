@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import multiprocessing as mp
+import os
+import threading
+
+import numpy as np
+
+from .vector_store import Document, VectorStore, _top_k
+
+
+def _attach(source: Dict[str, Any]) -> Tuple[np.ndarray, Optional[shared_memory.SharedMemory]]:
+    """Map the shared embedding matrix described by `source` without copying it."""
+    shape = tuple(source["shape"])
+    if source["kind"] == "file":
+        return np.memmap(source["path"], dtype=np.float32, mode="r", offset=source["offset"], shape=shape), None
+    shm = shared_memory.SharedMemory(name=source["name"])
+    return np.ndarray(shape, dtype=np.float32, buffer=shm.buf), shm
+
+
+def _shard_worker(conn: Any, source: Dict[str, Any], lo: int, hi: int) -> None:
+    """Serve local top-k requests for rows [lo, hi) until a None message arrives."""
+    matrix, shm = _attach(source)
+    block = matrix[lo:hi]
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            q, k = msg
+            scores = q @ block.T
+            out = []
+            for row in scores:
+                top = _top_k(row, k)
+                out.append((top + lo, row[top]))
+            conn.send(out)
+    finally:
+        del block, matrix
+        if shm is not None:
+            shm.close()
+        conn.close()
+
+
+class ShardedSearcher:
+    """
+    Multi-process exact search over a snapshot of a `VectorStore`.
+
+    - The store's rows are split into `n_shards` contiguous ranges, one worker process each.
+    - Workers map a single copy of the embeddings: the store's own `vectors.npy` when it was
+      loaded with mmap=True, otherwise a shared-memory block created once here.
+    - Each query batch is scored by all shards in parallel; the per-shard top-k lists are
+      merged with the same tie-breaking as `VectorStore.search`.
+    - The searcher is a snapshot: call `refresh()` after adding or deleting documents.
+    - Safe to share between threads; searches take turns on the shard workers' pipes.
+    - For best scaling, limit BLAS threads per process (e.g. OPENBLAS_NUM_THREADS=1).
+
+    Example:
+        >>> with ShardedSearcher(vs, n_shards=8) as searcher:
+        ...     results = searcher.search("refund policy", k=5)
+    """
+
+    def __init__(self, store: VectorStore, n_shards: Optional[int] = None) -> None:
+        self._store = store
+        self._n_shards = n_shards or os.cpu_count() or 1
+        if self._n_shards <= 0:
+            raise ValueError("n_shards must be > 0")
+        # Held across each send/receive exchange so replies reach the caller that asked.
+        self._lock = threading.RLock()
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._workers: List[Tuple[Any, Any]] = []
+        self._documents: List[Document] = []
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-snapshot the store and restart the shard workers."""
+        with self._lock:
+            self.close()
+            matrix = self._store.embeddings
+            self._documents = self._store.documents
+            self._dim = matrix.shape[1]
+            n = matrix.shape[0]
+            if n == 0:
+                return
+            filename = getattr(matrix, "filename", None)
+            if filename is not None:
+                source = {"kind": "file", "path": filename, "offset": matrix.offset, "shape": matrix.shape}
+            else:
+                self._shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+                shared = np.ndarray(matrix.shape, dtype=np.float32, buffer=self._shm.buf)
+                shared[:] = matrix
+                del shared
+                source = {"kind": "shm", "name": self._shm.name, "shape": matrix.shape}
+            bounds = np.linspace(0, n, min(self._n_shards, n) + 1, dtype=np.int64)
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                parent, child = mp.Pipe()
+                proc = mp.Process(target=_shard_worker, args=(child, source, int(lo), int(hi)), daemon=True)
+                proc.start()
+                child.close()
+                self._workers.append((parent, proc))
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
+        return self.search_by_vectors(self._store.embedder.embed([query]), k)[0]
+
+    def search_many(self, queries: Sequence[str], k: int = 5) -> List[List[Tuple[Document, float]]]:
+        if not queries:
+            return []
+        return self.search_by_vectors(self._store.embedder.embed(list(queries)), k)
+
+    def search_by_vectors(
+        self, vectors: Sequence[Sequence[float]] | np.ndarray, k: int = 5
+    ) -> List[List[Tuple[Document, float]]]:
+        q = np.array(vectors, dtype=np.float32, ndmin=2)
+        with self._lock:
+            if not self._workers:
+                return [[] for _ in range(q.shape[0])]
+            if q.shape[1] != self._dim:
+                # Different dimensions — cannot compare meaningfully; zero rows score 0.0
+                q = np.zeros((q.shape[0], self._dim), dtype=np.float32)
+            norms = np.linalg.norm(q, axis=1, keepdims=True)
+            np.divide(q, norms, out=q, where=norms > 0)
+            for conn, _ in self._workers:
+                conn.send((q, k))
+            partials = [conn.recv() for conn, _ in self._workers]
+            documents = self._documents
+        results: List[List[Tuple[Document, float]]] = []
+        for i in range(q.shape[0]):
+            rows = np.concatenate([p[i][0] for p in partials])
+            scores = np.concatenate([p[i][1] for p in partials])
+            # Shards cover ascending row ranges, so `rows` is sorted and _top_k's
+            # positional tie-break matches a single-shard scan.
+            top = _top_k(scores, k)
+            results.append([(documents[rows[j]], float(scores[j])) for j in top])
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            for conn, proc in self._workers:
+                try:
+                    conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                proc.join(timeout=5)
+                if proc.is_alive():
+                    proc.terminate()
+                conn.close()
+            self._workers = []
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None
+
+    def __enter__(self) -> "ShardedSearcher":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
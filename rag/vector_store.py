@@ -1,11 +1,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Iterable, List, Optional, Protocol, Sequence, Tuple, Dict, Any
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Protocol, Sequence, TextIO, Tuple, Dict, Any, Union
 
-import math
+import asyncio
+import hashlib
 import json
 import os
+import random
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from .ann import VectorIndex, load_index
+from .bm25 import BM25Index
+from .dedup import MinHashLSH
+from .metadata_index import MetadataIndex
+from .quantization import Quantizer, load_quantizer, make_quantizer
 
 
 @dataclass
@@ -19,6 +34,61 @@ class Document:
     id: Optional[str] = None
 
 
+@dataclass
+class Chunk:
+    """A chunk of a source text with its [start, end) character offsets into the source."""
+
+    text: str
+    start: int
+    end: int
+
+
+TextSource = Union[str, TextIO]
+
+# Code points for which str.isspace() is True, i.e. what str.split() splits on.
+_WHITESPACE = np.array(
+    [9, 10, 11, 12, 13, 28, 29, 30, 31, 32, 133, 160, 5760, *range(8192, 8203), 8232, 8233, 8239, 8287, 12288],
+    dtype=np.uint32,
+)
+
+
+def _word_block(text: str, base: int) -> Tuple[List[str], List[int], List[int]]:
+    """Words of `text` with their absolute [start, end) offsets, found with vectorized code-point scans."""
+    codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    is_word = ~np.isin(codes, _WHITESPACE)
+    edges = np.diff(is_word.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1) + base
+    ends = np.flatnonzero(edges == -1) + base
+    return text.split(), starts.tolist(), ends.tolist()
+
+
+def _iter_word_blocks(source: TextSource, read_size: int) -> Iterator[Tuple[List[str], List[int], List[int]]]:
+    """Yield (words, starts, ends) block by block; a word is never split across blocks."""
+    if isinstance(source, str):
+        blocks: Iterable[str] = (source[i : i + read_size] for i in range(0, len(source), read_size))
+    else:
+        blocks = iter(lambda: source.read(read_size), "")
+    base = 0
+    # Pieces of a word that may continue in the next block; they hold no whitespace.
+    carry: List[str] = []
+    for block in blocks:
+        # A word touching the end of the block may continue in the next one. The carry has
+        # no whitespace, so only the new block is scanned (no rescans of a long word).
+        cut = len(block)
+        if not block[-1].isspace():
+            cut -= len(block.rsplit(None, 1)[-1])
+        if not cut:
+            carry.append(block)
+            continue
+        buf = "".join(carry) + block[:cut]
+        yield _word_block(buf, base)
+        base += len(buf)
+        carry = [block[cut:]]
+    tail = "".join(carry)
+    if tail:
+        yield _word_block(tail, base)
+
+
 class Embedder(Protocol):
     """Protocol for embedding backends."""
 
@@ -30,6 +100,17 @@ class Embedder(Protocol):
         ...
 
 
+class AsyncEmbedder(Protocol):
+    """Protocol for asyncio embedding backends."""
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:  # pragma: no cover - protocol
+        ...
+
+    @property
+    def dimension(self) -> Optional[int]:  # pragma: no cover - protocol
+        ...
+
+
 class OpenAIEmbedder:
     """
     OpenAI embeddings-based embedder.
@@ -37,9 +118,12 @@ class OpenAIEmbedder:
     - Uses the official `openai` Python SDK.
     - Reads `OPENAI_API_KEY` from environment if client not provided.
     - Default model: `text-embedding-3-small` (1,536 dims; cost-effective).
+    - `dimensions` requests shortened embeddings (text-embedding-3 models only).
     """
 
-    def __init__(self, model: str = "text-embedding-3-small", client: Any = None) -> None:
+    def __init__(
+        self, model: str = "text-embedding-3-small", client: Any = None, dimensions: Optional[int] = None
+    ) -> None:
         try:
             from openai import OpenAI  # type: ignore
         except Exception as e:  # pragma: no cover - import guard
@@ -48,12 +132,18 @@ class OpenAIEmbedder:
         self._OpenAI = OpenAI
         self._client = client or OpenAI()
         self._model = model
-        self._dimension: Optional[int] = None
+        self._dimensions = dimensions
+        self._dimension: Optional[int] = dimensions
 
     @property
     def model(self) -> str:
         return self._model
 
+    @property
+    def dimensions(self) -> Optional[int]:
+        """Requested output dimension, or None for the model's native size."""
+        return self._dimensions
+
     @property
     def dimension(self) -> Optional[int]:
         return self._dimension
@@ -62,30 +152,225 @@ class OpenAIEmbedder:
         if not texts:
             return []
         # OpenAI embeddings API expects `input` as a list for batching.
-        res = self._client.embeddings.create(model=self._model, input=list(texts))
+        extra = {"dimensions": self._dimensions} if self._dimensions else {}
+        res = self._client.embeddings.create(model=self._model, input=list(texts), **extra)
         vectors = [d.embedding for d in res.data]
         if vectors and self._dimension is None:
             self._dimension = len(vectors[0])
         return vectors
 
 
-def _cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
-    if not a or not b:
-        return 0.0
-    if len(a) != len(b):
-        # Different dimensions — cannot compare meaningfully
-        return 0.0
-    dot = 0.0
-    na = 0.0
-    nb = 0.0
-    for x, y in zip(a, b):
-        dot += x * y
-        na += x * x
-        nb += y * y
-    denom = math.sqrt(na) * math.sqrt(nb)
-    if denom == 0:
-        return 0.0
-    return dot / denom
+class AsyncOpenAIEmbedder:
+    """
+    OpenAI embeddings-based embedder for asyncio code.
+
+    Same options as `OpenAIEmbedder`, but built on `openai.AsyncOpenAI` so embedding
+    calls never block the event loop.
+    """
+
+    def __init__(
+        self, model: str = "text-embedding-3-small", client: Any = None, dimensions: Optional[int] = None
+    ) -> None:
+        try:
+            from openai import AsyncOpenAI  # type: ignore
+        except Exception as e:  # pragma: no cover - import guard
+            raise RuntimeError("openai package is required for AsyncOpenAIEmbedder") from e
+
+        self._client = client or AsyncOpenAI()
+        self._model = model
+        self._dimensions = dimensions
+        self._dimension: Optional[int] = dimensions
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def dimensions(self) -> Optional[int]:
+        """Requested output dimension, or None for the model's native size."""
+        return self._dimensions
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self._dimension
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        extra = {"dimensions": self._dimensions} if self._dimensions else {}
+        res = await self._client.embeddings.create(model=self._model, input=list(texts), **extra)
+        vectors = [d.embedding for d in res.data]
+        if vectors and self._dimension is None:
+            self._dimension = len(vectors[0])
+        return vectors
+
+
+class HashingEmbedder:
+    """
+    Deterministic, network-free embedder for tests and benchmarks.
+
+    - Each lower-cased word is hashed (CRC32, stable across runs and processes) into
+      one of `dimension` buckets with a +/-1 sign, so texts sharing words score higher.
+    - No model, no API calls; identical input always gives identical vectors.
+    """
+
+    def __init__(self, dimension: int = 256, seed: int = 0) -> None:
+        if dimension <= 0:
+            raise ValueError("dimension must be > 0")
+        self._dimension = dimension
+        # CRC32 of the seed is used as the starting value, giving each seed its own hash family.
+        self._seed = zlib.crc32(seed.to_bytes(4, "little", signed=False))
+
+    @property
+    def model(self) -> str:
+        return f"hashing-{self._dimension}"
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self._dimension
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        out = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(w.encode("utf-8"), self._seed) for w in text.lower().split()),
+                dtype=np.uint32,
+            )
+            if hashes.size:
+                signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+                np.add.at(out[i], hashes % self._dimension, signs)
+        return out.tolist()
+
+
+# Binary persistence layout (see VectorStore.save)
+_BINARY_FORMAT = "rag.vector_store"
+_BINARY_VERSION = 1
+_MANIFEST_FILE = "manifest.json"
+_VECTORS_FILE = "vectors.npy"
+_DOCUMENTS_FILE = "documents.jsonl"
+_INDEX_FILE = "index.npz"
+_QUANTIZED_FILE = "quantized.npz"
+_LEXICAL_FILE = "lexical.npz"
+_DEDUP_FILE = "dedup.npz"
+
+
+# Fraction of deleted rows that triggers automatic compaction
+_COMPACT_RATIO = 0.25
+
+# Hybrid search: candidates taken from each ranking, and the reciprocal rank fusion constant
+_SEARCH_MODES = ("vector", "lexical", "hybrid")
+_FUSION_DEPTH = 50
+_RRF_K = 60
+
+# Metadata key under which a stored chunk lists the near-duplicates collapsed into it
+_DUPLICATES_KEY = "duplicates"
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for OpenAI's English BPE vocabularies)."""
+    return len(text) // 4 + 1
+
+
+def _iter_batches(docs: Iterable[Document], max_items: int, max_tokens: Optional[int]) -> Iterator[List[Document]]:
+    """
+    Group documents into batches capped by item count and estimated tokens.
+
+    A single document larger than `max_tokens` still gets a batch of its own.
+    """
+    batch: List[Document] = []
+    tokens = 0
+    for d in docs:
+        cost = estimate_tokens(d.text)
+        if batch and (len(batch) >= max_items or (max_tokens is not None and tokens + cost > max_tokens)):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(d)
+        tokens += cost
+    if batch:
+        yield batch
+
+
+def _is_rate_limit(exc: BaseException) -> bool:
+    # Avoid importing openai here: match its RateLimitError by name or an HTTP 429 status.
+    if exc.__class__.__name__ == "RateLimitError":
+        return True
+    return getattr(exc, "status_code", None) == 429
+
+
+def _embed_with_retry(
+    embedder: Embedder, texts: Sequence[str], max_retries: int, backoff: float
+) -> List[List[float]]:
+    """Call `embedder.embed`, retrying rate-limit errors with jittered exponential backoff."""
+    attempt = 0
+    while True:
+        try:
+            return embedder.embed(texts)
+        except Exception as e:
+            if attempt >= max_retries or not _is_rate_limit(e):
+                raise
+            time.sleep(_retry_delay(attempt, backoff))
+            attempt += 1
+
+
+def _retry_delay(attempt: int, backoff: float) -> float:
+    return min(60.0, backoff * (2**attempt)) * (1 + random.random())
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row in place; all-zero rows are left as zeros."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first.
+
+    Uses partial selection instead of a full sort. Ties are broken by the lower
+    index, matching a stable descending sort over the whole score array.
+    """
+
+    n = scores.shape[0]
+    k = min(max(0, k), n)
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[: k - above.size]
+        idx = np.concatenate([above, ties])
+    else:
+        idx = np.arange(n)
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+
+def _fuse(
+    vector: Tuple[np.ndarray, np.ndarray],
+    lexical: Tuple[np.ndarray, np.ndarray],
+    k: int,
+    fusion: str,
+    alpha: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge two (rows, scores) rankings into the top-k (rows, fused scores); ties go to the lower row."""
+    rows = np.union1d(vector[0], lexical[0])
+    fused = np.zeros(rows.shape[0], dtype=np.float64)
+    for weight, (hit_rows, hit_scores) in ((alpha, vector), (1.0 - alpha, lexical)):
+        if not hit_rows.size:
+            continue
+        pos = np.searchsorted(rows, hit_rows)
+        if fusion == "rrf":
+            fused[pos] += 1.0 / (_RRF_K + 1 + np.arange(hit_rows.shape[0]))
+        else:
+            lo, hi = float(hit_scores.min()), float(hit_scores.max())
+            scaled = (hit_scores - lo) / (hi - lo) if hi > lo else np.ones(hit_rows.shape[0])
+            fused[pos] += weight * scaled
+    top = _top_k(fused, k)
+    return rows[top], fused[top]
 
 
 class VectorStore:
@@ -99,70 +384,269 @@ class VectorStore:
         >>> results = vs.search("embeddings", k=1)
         >>> results[0][0].text  # top document text
         'OpenAI embeddings are great!'
+
+    Pass an `index` (e.g. `rag.ann.IVFIndex`) for approximate search on large
+    stores; without one, search is exact brute force.
+
+    `quantization` ("float16", "int8" or "binary") keeps a compressed copy of the
+    embeddings for the brute-force scan. The best `rescore * k` candidates are then
+    rescored with full-precision vectors (rescore=0 returns the approximate scores).
+    Load with mmap=True so the float32 block stays on disk and only the rescored
+    rows are paged in.
+
+    `lexical=True` also keeps a BM25 index over the chunk texts, enabling
+    `search(..., mode="lexical")` for exact identifiers (order numbers, SKUs) and
+    `mode="hybrid"`, which fuses the lexical and vector rankings.
+
+    `dedup` (a Jaccard threshold such as 0.9) drops near-duplicate chunks before they
+    are embedded (see `rag.dedup.MinHashLSH`). The chunk that was kept lists the others
+    under `metadata["duplicates"]` as {"id", "metadata"} entries, and metadata filters
+    match it on their metadata too, so one vector stands for every source.
+
+    The `a*` methods (`aadd_documents`, `asearch`, `asearch_many`) are for asyncio code:
+    they use `async_embedder` when given (else run `embedder` in a thread) and move
+    scoring off the event loop. Scoring and changes to the stored rows hold one lock,
+    so a search in a worker thread never sees a half-applied add, delete or compaction.
     """
 
-    def __init__(self, embedder: Embedder) -> None:
+    def __init__(
+        self,
+        embedder: Embedder,
+        index: Optional[VectorIndex] = None,
+        *,
+        quantization: Optional[str] = None,
+        rescore: int = 4,
+        async_embedder: Optional[AsyncEmbedder] = None,
+        lexical: bool = False,
+        dedup: Optional[float] = None,
+    ) -> None:
+        if rescore < 0:
+            raise ValueError("rescore must be >= 0")
         self._embedder = embedder
+        self._async_embedder = async_embedder
+        self._index = index
+        self._quantizer: Optional[Quantizer] = make_quantizer(quantization) if quantization else None
+        self._rescore = rescore
         self._documents: List[Document] = []
-        self._embeddings: List[List[float]] = []
+        # Pre-normalized float32 rows; only the first `_size` rows are in use and
+        # the buffer grows geometrically as documents are added.
+        self._matrix: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self._size = 0
+        # Deleted rows stay in place (masked out of search) until `compact` runs.
+        self._alive = np.ones(0, dtype=bool)
+        self._n_dead = 0
+        self._metadata_index = MetadataIndex()
+        # Held while rows change and while searches score them (asearch runs in a thread).
+        self._lock = threading.RLock()
+        # Rows per chunk id (and per collapsed duplicate's id) for delete/upsert lookups.
+        self._id_rows: Dict[str, List[int]] = {}
+        # Whether any row holds collapsed duplicates; until then deletes skip `_detach_duplicates`.
+        self._has_duplicates = False
+        self._lexical: Optional[BM25Index] = BM25Index() if lexical else None
+        # One signature per row, appended as chunks pass the duplicate check.
+        self._dedup: Optional[MinHashLSH] = MinHashLSH(threshold=dedup) if dedup is not None else None
+
+    def __len__(self) -> int:
+        return self._size - self._n_dead
+
+    @property
+    def embedder(self) -> Embedder:
+        return self._embedder
+
+    @property
+    def documents(self) -> List[Document]:
+        """Stored documents in row order (aligned with `embeddings`)."""
+        self.compact()
+        return list(self._documents)
+
+    @property
+    def index(self) -> Optional[VectorIndex]:
+        return self._index
+
+    def rebuild_index(self) -> None:
+        """Re-index every stored vector from scratch (e.g. to retrain IVF centroids)."""
+        if self._index is None:
+            return
+        with self._lock:
+            self.compact()
+            self._index.reset()
+            if self._size:
+                self._index.add(self._matrix[: self._size], 0)
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Read-only view of the stored (L2-normalized) embedding matrix."""
+        self.compact()
+        view = self._matrix[: self._size]
+        view.flags.writeable = False
+        return view
+
+    def _append(self, docs: Sequence[Document], vectors: Sequence[Sequence[float]] | np.ndarray) -> None:
+        """Store documents with their embeddings and index their metadata."""
+        with self._lock:
+            start = self._size
+            self._append_vectors(vectors)
+            self._documents.extend(docs)
+            self._index_metadata(docs, start)
+            if self._lexical is not None:
+                self._lexical.add((d.text for d in docs), start)
+
+    def _index_metadata(self, docs: Sequence[Document], start: int) -> None:
+        """Index metadata and ids of consecutive rows; a row also matches its collapsed duplicates."""
+        self._metadata_index.add((d.metadata for d in docs), start)
+        for row, d in enumerate(docs, start):
+            if d.id is not None:
+                self._id_rows.setdefault(d.id, []).append(row)
+            for ref in d.metadata.get(_DUPLICATES_KEY, ()):
+                self._metadata_index.add([ref["metadata"]], row)
+                self._id_rows.setdefault(ref["id"], []).append(row)
+                self._has_duplicates = True
+
+    def _append_vectors(self, vectors: Sequence[Sequence[float]] | np.ndarray) -> None:
+        if len(vectors) == 0:
+            return
+        block = np.asarray(vectors, dtype=np.float32)
+        if block.ndim != 2:
+            raise ValueError("embeddings must be a 2-D sequence of equal-length vectors")
+        dim = block.shape[1]
+        if self._size and dim != self._matrix.shape[1]:
+            raise ValueError(f"embedding dimension {dim} does not match store dimension {self._matrix.shape[1]}")
+        needed = self._size + block.shape[0]
+        if needed > self._matrix.shape[0] or dim != self._matrix.shape[1]:
+            capacity = max(needed, 2 * self._matrix.shape[0], 1024)
+            grown = np.empty((capacity, dim), dtype=np.float32)
+            if self._size:
+                grown[: self._size] = self._matrix[: self._size]
+            self._matrix = grown
+            alive = np.ones(capacity, dtype=bool)
+            alive[: self._size] = self._alive[: self._size]
+            self._alive = alive
+        self._matrix[self._size : needed] = _normalize_rows(block)
+        self._alive[self._size : needed] = True
+        start, self._size = self._size, needed
+        if self._quantizer is not None:
+            self._quantizer.add(self._matrix[start:needed])
+        if self._index is not None:
+            self._index.add(self._matrix[: self._size], start)
+
+    def _query_matrix(self, vectors: Sequence[Sequence[float]] | np.ndarray) -> np.ndarray:
+        """Normalized (n_queries, dim) float32 copy of the query vectors."""
+        q = np.array(vectors, dtype=np.float32, ndmin=2)
+        if q.ndim != 2:
+            raise ValueError("query vectors must form a 2-D matrix")
+        if q.shape[1] != self._matrix.shape[1]:
+            # Different dimensions — cannot compare meaningfully; zero rows score 0.0
+            return np.zeros((q.shape[0], self._matrix.shape[1]), dtype=np.float32)
+        return _normalize_rows(q)
 
     # --------------- Chunking ---------------
     @staticmethod
-    def chunk_text(
-        text: str,
+    def iter_chunks(
+        source: TextSource,
         chunk_size: int = 800,
         chunk_overlap: int = 200,
         strategy: str = "words",
-    ) -> List[str]:
+        *,
+        read_size: int = 1 << 16,
+    ) -> Iterator[Chunk]:
         """
-        Split text into chunks with overlap.
+        Lazily split a string or text stream into overlapping chunks.
 
-        - strategy="words" splits on whitespace to reduce mid-word cuts.
-        - chunk_size and chunk_overlap are approximate for word strategy (by word count),
-          but aim to keep chunk lengths balanced.
+        - Produces the same chunk texts as `chunk_text`, each with its (start, end)
+          character offsets into the source (word chunks span first to last word).
+        - Streams are read `read_size` characters at a time, so memory stays bounded
+          by one chunk plus one read block.
         """
 
         if chunk_size <= 0:
             raise ValueError("chunk_size must be > 0")
         if chunk_overlap < 0 or chunk_overlap >= chunk_size:
             raise ValueError("chunk_overlap must be >= 0 and < chunk_size")
+        if strategy == "words":
+            return VectorStore._iter_word_chunks(source, chunk_size, chunk_overlap, read_size)
+        if strategy == "chars":
+            return VectorStore._iter_char_chunks(source, chunk_size, chunk_overlap, read_size)
+        raise ValueError(f"Unsupported chunking strategy: {strategy}")
 
-        if not text:
-            return []
+    @staticmethod
+    def _iter_word_chunks(source: TextSource, chunk_size: int, chunk_overlap: int, read_size: int) -> Iterator[Chunk]:
+        step = max(1, chunk_size - chunk_overlap)
+        words: List[str] = []
+        starts: List[int] = []
+        ends: List[int] = []
+        head = 0  # first word of the next window
+        covered = 0  # words before this index are in an emitted chunk
+        for block_words, block_starts, block_ends in _iter_word_blocks(source, read_size):
+            words.extend(block_words)
+            starts.extend(block_starts)
+            ends.extend(block_ends)
+            while len(words) - head >= chunk_size:
+                tail = head + chunk_size
+                yield Chunk(" ".join(words[head:tail]), starts[head], ends[tail - 1])
+                covered = tail
+                head += step
+            if head >= 4096:
+                # Drop consumed words in bulk to keep memory bounded.
+                del words[:head], starts[:head], ends[:head]
+                covered -= head
+                head = 0
+        if len(words) > covered:
+            yield Chunk(" ".join(words[head:]), starts[head], ends[-1])
 
-        if strategy == "words":
-            words = text.split()
-            if not words:
-                return []
-            step = max(1, chunk_size - chunk_overlap)
-            chunks: List[str] = []
-            start = 0
-            while start < len(words):
-                end = min(len(words), start + chunk_size)
-                chunk = " ".join(words[start:end])
-                chunks.append(chunk)
-                if end == len(words):
-                    break
-                start += step
-            return chunks
-        elif strategy == "chars":
-            chunks = []
+    @staticmethod
+    def _iter_char_chunks(source: TextSource, chunk_size: int, chunk_overlap: int, read_size: int) -> Iterator[Chunk]:
+        step = chunk_size - chunk_overlap
+        if isinstance(source, str):
             start = 0
-            step = chunk_size - chunk_overlap
-            while start < len(text):
-                end = min(len(text), start + chunk_size)
-                chunks.append(text[start:end])
-                if end == len(text):
+            while start < len(source):
+                end = min(len(source), start + chunk_size)
+                yield Chunk(source[start:end], start, end)
+                if end == len(source):
                     break
                 start += step
-            return chunks
-        else:
-            raise ValueError(f"Unsupported chunking strategy: {strategy}")
+            return
+        buf = ""
+        base = 0
+        covered = 0
+        eof = False
+        while True:
+            while not eof and len(buf) < chunk_size:
+                block = source.read(read_size)
+                if not block:
+                    eof = True
+                buf += block
+            if len(buf) >= chunk_size:
+                yield Chunk(buf[:chunk_size], base, base + chunk_size)
+                covered = base + chunk_size
+                buf = buf[step:]
+                base += step
+                continue
+            if base + len(buf) > covered:
+                yield Chunk(buf, base, base + len(buf))
+            return
+
+    @staticmethod
+    def chunk_text(
+        text: str,
+        chunk_size: int = 800,
+        chunk_overlap: int = 200,
+        strategy: str = "words",
+    ) -> List[str]:
+        """
+        Split text into chunks with overlap.
+
+        - strategy="words" splits on whitespace to reduce mid-word cuts.
+        - chunk_size and chunk_overlap are approximate for word strategy (by word count),
+          but aim to keep chunk lengths balanced.
+        - See `iter_chunks` for a lazy, offset-preserving variant.
+        """
+
+        return [c.text for c in VectorStore.iter_chunks(text, chunk_size, chunk_overlap, strategy)]
 
     # --------------- Indexing ---------------
     def add_documents(
         self,
-        docs: Iterable[Document | str],
+        docs: Iterable[Document | str | TextIO],
         *,
         chunk: bool = True,
         chunk_size: int = 800,
@@ -170,78 +654,729 @@ class VectorStore:
         chunk_strategy: str = "words",
         batch_size: int = 64,
         parent_id_key: str = "parent_id",
+        max_batch_tokens: Optional[int] = 100_000,
+        max_concurrency: int = 1,
+        max_retries: int = 5,
+        retry_backoff: float = 1.0,
     ) -> int:
         """
         Add documents or raw strings to the store.
 
-        - If `chunk` is True, each document will be split into chunks before embedding.
-        - Returns the total number of chunks added.
+        - If `chunk` is True, each document will be split into chunks before embedding;
+          chunk metadata records `start_index` / `end_index` offsets into the source.
+        - Items may also be open text streams, which are chunked as they are read.
+        - Each embedding request holds at most `batch_size` chunks and roughly
+          `max_batch_tokens` tokens (see `estimate_tokens`); None disables the token cap.
+        - Up to `max_concurrency` requests run at once; chunks are still stored in order.
+        - Rate-limit errors are retried up to `max_retries` times with exponential backoff
+          starting at `retry_backoff` seconds.
+        - With `dedup`, near-duplicate chunks are recorded on the chunk they duplicate
+          instead of being embedded.
+        - Returns the total number of chunks added (collapsed duplicates not included).
         """
 
-        # Normalize to Document objects
-        normalized: List[Document] = []
+        if batch_size <= 0:
+            raise ValueError("batch_size must be > 0")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be > 0")
+
+        # Chunks are produced lazily, so only the batches in flight are held in memory.
+        to_index = self._iter_index_docs(docs, chunk, chunk_size, chunk_overlap, chunk_strategy, parent_id_key)
+
+        # Embed in batches
+        total_added = 0
+        batches = _iter_batches(self._collapse_duplicates(to_index), batch_size, max_batch_tokens)
+        try:
+            for batch, vectors in self._embed_batches(batches, max_concurrency, max_retries, retry_backoff):
+                self._append(batch, vectors)
+                total_added += len(batch)
+        finally:
+            self._discard_pending_signatures()
+        return total_added
+
+    def _iter_index_docs(
+        self,
+        docs: Iterable[Document | str | TextIO],
+        chunk: bool,
+        chunk_size: int,
+        chunk_overlap: int,
+        chunk_strategy: str,
+        parent_id_key: str,
+    ) -> Iterator[Document]:
+        """Yield the documents (or chunks) to embed, reading text streams incrementally."""
         for d in docs:
             if isinstance(d, Document):
-                normalized.append(d)
+                source: TextSource = d.text
+            elif hasattr(d, "read"):
+                source = d  # type: ignore[assignment]
+                d = Document(text="")
             else:
-                normalized.append(Document(text=str(d)))
-
-        # Prepare chunked docs
-        to_index: List[Document] = []
-        for d in normalized:
-            if chunk:
-                chunks = self.chunk_text(d.text, chunk_size, chunk_overlap, chunk_strategy)
-                if not chunks:
+                source = str(d)
+                d = Document(text=source)
+            if not chunk:
+                if not isinstance(source, str):
+                    d = Document(text=source.read(), metadata=d.metadata, id=d.id)
+                yield d
+                continue
+            for i, ch in enumerate(self.iter_chunks(source, chunk_size, chunk_overlap, chunk_strategy)):
+                meta = dict(d.metadata) if d.metadata else {}
+                if d.id:
+                    meta[parent_id_key] = d.id
+                meta["start_index"] = ch.start
+                meta["end_index"] = ch.end
+                chunk_id = f"{d.id or 'doc'}:{i}"
+                yield Document(text=ch.text, metadata=meta, id=chunk_id)
+
+    def _collapse_duplicates(self, docs: Iterable[Document], exclude: Iterable[int] = ()) -> Iterator[Document]:
+        """
+        Yield `docs` without near-duplicates of stored or already yielded documents.
+
+        A dropped document is recorded under `metadata["duplicates"]` of the one it
+        duplicates. Rows in `exclude` (about to be replaced) are not matched against.
+        """
+        if self._dedup is None:
+            yield from docs
+            return
+        lsh = self._dedup
+        skip = set(exclude)
+        # Yielded documents not stored yet, by the row they will get.
+        pending: Dict[int, Document] = {}
+        for d in docs:
+            while pending and next(iter(pending)) < self._size:
+                del pending[next(iter(pending))]
+            signature = lsh.signature(d.text)
+            original: Optional[Document] = None
+            for pos in lsh.query(signature):
+                if pos >= self._size:
+                    original = pending[pos]
+                elif self._alive[pos] and pos not in skip:
+                    original = self._documents[pos]
+                else:
                     continue
-                for i, ch in enumerate(chunks):
-                    meta = dict(d.metadata) if d.metadata else {}
-                    if d.id:
-                        meta[parent_id_key] = d.id
-                    chunk_id = f"{d.id or 'doc'}:{i}"
-                    to_index.append(Document(text=ch, metadata=meta, id=chunk_id))
-            else:
-                to_index.append(d)
+                break
+            if original is None:
+                pos = lsh.add(signature)
+                pending[pos] = d
+                yield d
+                continue
+            ref = {"id": d.id, "metadata": dict(d.metadata)}
+            # Rebind rather than mutate: the metadata dict may be shared with the caller.
+            with self._lock:
+                original.metadata = {**original.metadata, _DUPLICATES_KEY: [*original.metadata.get(_DUPLICATES_KEY, ()), ref]}
+                self._has_duplicates = True
+                if pos < self._size:
+                    self._metadata_index.add([ref["metadata"]], pos)
+                    self._id_rows.setdefault(d.id, []).append(pos)
 
-        # Embed in batches
+    def _discard_pending_signatures(self) -> None:
+        """Forget signatures of chunks that were checked but never stored (e.g. embedding failed)."""
+        if self._dedup is not None:
+            self._dedup.truncate(self._size)
+
+    def _embed_batches(
+        self,
+        batches: Iterable[List[Document]],
+        max_concurrency: int,
+        max_retries: int,
+        retry_backoff: float,
+    ) -> Iterator[Tuple[List[Document], List[List[float]]]]:
+        """Embed batches with up to `max_concurrency` requests in flight, yielding in input order."""
+        if max_concurrency == 1:
+            for batch in batches:
+                yield batch, _embed_with_retry(self._embedder, [b.text for b in batch], max_retries, retry_backoff)
+            return
+
+        pending: List[Tuple[List[Document], Future]] = []
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        try:
+            for batch in batches:
+                texts = [b.text for b in batch]
+                pending.append((batch, executor.submit(_embed_with_retry, self._embedder, texts, max_retries, retry_backoff)))
+                if len(pending) >= max_concurrency:
+                    done, fut = pending.pop(0)
+                    yield done, fut.result()
+            for done, fut in pending:
+                yield done, fut.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # --------------- Search ---------------
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        *,
+        exact: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+        fusion: str = "rrf",
+        alpha: float = 0.5,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Return top-k documents with cosine similarity scores.
+
+        - Scores are a single matrix-vector product against the normalized rows.
+        - Ties keep insertion order; a query of the wrong dimension scores 0.0 everywhere.
+        - With an ANN index only its candidates are scored; `exact=True` bypasses it.
+        - `filter` restricts scoring to rows whose metadata matches (see `MetadataIndex`);
+          filtered searches are always exact over the matching rows.
+        - mode="lexical" ranks by BM25 instead (no embedding call) and mode="hybrid"
+          fuses both rankings; both need a store created with lexical=True.
+        - Hybrid `fusion` is "rrf" (reciprocal rank fusion, sum of 1 / (60 + rank)) or
+          "weighted" (alpha * vector + (1 - alpha) * BM25, each min-max scaled over the
+          candidates). Hybrid results carry the fused score.
+        """
+        return self.search_many([query], k, exact=exact, filter=filter, mode=mode, fusion=fusion, alpha=alpha)[0]
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        k: int = 5,
+        *,
+        exact: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+        fusion: str = "rrf",
+        alpha: float = 0.5,
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Search several queries at once.
+
+        - All queries are embedded in a single `embed` call.
+        - Returns one top-k result list per query, in input order.
+        """
+        self._check_mode(mode, fusion, alpha)
+        if not queries:
+            return []
+        if not len(self):
+            return [[] for _ in queries]
+        vectors = None if mode == "lexical" else self._embedder.embed(list(queries))
+        return self._search_texts(queries, vectors, k, exact, filter, mode, fusion, alpha)
+
+    def search_by_vectors(
+        self,
+        vectors: Sequence[Sequence[float]] | np.ndarray,
+        k: int = 5,
+        *,
+        exact: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Return top-k documents for each pre-computed query vector.
+
+        All queries are scored together as one matrix-matrix product, unless an ANN
+        index narrows each query down to its own candidate rows.
+        """
+        with self._lock:
+            q = self._query_matrix(vectors)
+            if not len(self):
+                return [[] for _ in range(q.shape[0])]
+            return [self._results(rows, scores) for rows, scores in self._vector_top(q, k, exact, filter)]
+
+    def _check_mode(self, mode: str, fusion: str, alpha: float) -> None:
+        if mode not in _SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode: {mode}")
+        if mode != "vector" and self._lexical is None:
+            raise ValueError(f"mode={mode!r} needs a store created with lexical=True")
+        if fusion not in ("rrf", "weighted"):
+            raise ValueError(f"Unsupported fusion: {fusion}")
+        if not 0.0 <= alpha <= 1.0:
+            raise ValueError("alpha must be in [0, 1]")
+
+    def _results(self, rows: np.ndarray, scores: np.ndarray) -> List[Tuple[Document, float]]:
+        return [(self._documents[r], float(score)) for r, score in zip(rows, scores)]
+
+    def _search_texts(
+        self,
+        queries: Sequence[str],
+        vectors: Optional[Sequence[Sequence[float]]],
+        k: int,
+        exact: bool,
+        filter: Optional[Dict[str, Any]],
+        mode: str,
+        fusion: str,
+        alpha: float,
+    ) -> List[List[Tuple[Document, float]]]:
+        """Finish a validated `search_many` once its queries are embedded (vectors=None for lexical)."""
+        with self._lock:
+            if mode == "lexical":
+                return [self._results(rows, scores) for rows, scores in self._lexical_top(queries, k, filter)]
+            q = self._query_matrix(vectors)  # type: ignore[arg-type]
+            if mode == "vector":
+                return [self._results(rows, scores) for rows, scores in self._vector_top(q, k, exact, filter)]
+            depth = max(k, _FUSION_DEPTH)
+            vector_hits = self._vector_top(q, depth, exact, filter)
+            lexical_hits = self._lexical_top(queries, depth, filter)
+            return [self._results(*_fuse(v, lx, k, fusion, alpha)) for v, lx in zip(vector_hits, lexical_hits)]
+
+    def _vector_top(
+        self, q: np.ndarray, k: int, exact: bool, filter: Optional[Dict[str, Any]]
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Best (rows, cosine scores) per normalized query via the filter, ANN, quantized or exact path."""
+        if filter:
+            return self._search_rows(q, self.matching_rows(filter), k)
+        if self._index is not None and not exact:
+            candidates = self._index.candidates(q)
+            if candidates is not None:
+                return self._search_candidates(q, candidates, k)
+        if self._quantizer is not None and not exact:
+            return self._quantized_top(q, k, self._rescore)
+        scores = q @ self._matrix[: self._size].T
+        if self._n_dead:
+            # Deleted rows can never outrank a live one (cosine >= -1).
+            scores[:, ~self._alive[: self._size]] = -np.inf
+            k = min(k, len(self))
+        out: List[Tuple[np.ndarray, np.ndarray]] = []
+        for row in scores:
+            top = _top_k(row, k)
+            out.append((top, row[top]))
+        return out
+
+    def _lexical_top(
+        self, queries: Sequence[str], k: int, filter: Optional[Dict[str, Any]]
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Best (rows, BM25 scores) per query text; rows matching no query term are left out."""
+        rows = self.matching_rows(filter) if filter else None
+        out: List[Tuple[np.ndarray, np.ndarray]] = []
+        for query in queries:
+            scores = self._lexical.scores(query, self._size)  # type: ignore[union-attr]
+            if rows is not None:
+                scores = scores[rows]
+            elif self._n_dead:
+                scores[~self._alive[: self._size]] = 0.0
+            top = _top_k(scores, k)
+            top = top[scores[top] > 0]
+            out.append((top if rows is None else rows[top], scores[top]))
+        return out
+
+    def _quantized_top(self, q: np.ndarray, k: int, rescore: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Scan the quantized codes, then rescore the best `rescore * k` rows at full precision."""
+        scores = self._quantizer.scores(q, self._size)  # type: ignore[union-attr]
+        if self._n_dead:
+            scores[:, ~self._alive[: self._size]] = -np.inf
+            k = min(k, len(self))
+        out: List[Tuple[np.ndarray, np.ndarray]] = []
+        for qv, row in zip(q, scores):
+            if not rescore:
+                top = _top_k(row, k)
+                out.append((top, row[top]))
+                continue
+            rows = np.sort(_top_k(row, k * rescore))
+            if self._n_dead:
+                # With few live rows the candidates can include tombstones; never rescore those.
+                rows = rows[self._alive[rows]]
+            exact_scores = self._matrix[rows] @ qv
+            top = _top_k(exact_scores, k)
+            out.append((rows[top], exact_scores[top]))
+        return out
+
+    def quantization_report(self, k: int = 10, n_queries: int = 100, seed: int = 0) -> Dict[str, Any]:
+        """
+        Compare quantized search with full precision.
+
+        Uses up to `n_queries` stored vectors as queries and reports memory for both
+        representations plus recall@k of the quantized scan with and without rescoring.
+        """
+        if self._quantizer is None:
+            raise ValueError("store has no quantization configured")
+        self.compact()
+        full_bytes = int(self._size * self._matrix.shape[1] * 4)
+        report: Dict[str, Any] = {
+            "quantization": self._quantizer.kind,
+            "full_precision_bytes": full_bytes,
+            "quantized_bytes": self._quantizer.nbytes,
+            "saved_bytes": full_bytes - self._quantizer.nbytes,
+        }
+        if not self._size:
+            return report
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(self._size, size=min(n_queries, self._size), replace=False))
+        q = np.array(self._matrix[sample])
+        truth = [set(_top_k(row, k).tolist()) for row in q @ self._matrix[: self._size].T]
+
+        def recall(found: List[Tuple[np.ndarray, np.ndarray]]) -> float:
+            hits = sum(len(t & set(rows.tolist())) for t, (rows, _) in zip(truth, found))
+            return hits / sum(len(t) for t in truth)
+
+        report["recall"] = recall(self._quantized_top(q, k, 0))
+        report["recall_rescored"] = recall(self._quantized_top(q, k, self._rescore or 4))
+        report["recall_lost"] = 1.0 - report["recall_rescored" if self._rescore else "recall"]
+        return report
+
+    def matching_rows(self, filter: Dict[str, Any]) -> np.ndarray:
+        """Sorted row positions of live documents whose metadata matches `filter`."""
+        rows = self._metadata_index.match(filter)
+        if self._n_dead:
+            rows = rows[self._alive[rows]]
+        return rows
+
+    def _search_rows(self, q: np.ndarray, rows: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Score every query against the same row subset."""
+        scores = q @ self._matrix[rows].T
+        out: List[Tuple[np.ndarray, np.ndarray]] = []
+        for row in scores:
+            top = _top_k(row, k)
+            out.append((rows[top], row[top]))
+        return out
+
+    def _search_candidates(
+        self, q: np.ndarray, candidates: List[np.ndarray], k: int
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        out: List[Tuple[np.ndarray, np.ndarray]] = []
+        for qv, rows in zip(q, candidates):
+            if self._n_dead:
+                rows = rows[self._alive[rows]]
+            scores = self._matrix[rows] @ qv
+            top = _top_k(scores, k)
+            out.append((rows[top], scores[top]))
+        return out
+
+    # --------------- Async ---------------
+    async def _aembed(self, texts: Sequence[str]) -> List[List[float]]:
+        if self._async_embedder is not None:
+            return await self._async_embedder.embed(texts)
+        return await asyncio.to_thread(self._embedder.embed, texts)
+
+    async def _aembed_with_retry(self, texts: Sequence[str], max_retries: int, backoff: float) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                return await self._aembed(texts)
+            except Exception as e:
+                if attempt >= max_retries or not _is_rate_limit(e):
+                    raise
+                await asyncio.sleep(_retry_delay(attempt, backoff))
+                attempt += 1
+
+    async def aadd_documents(
+        self,
+        docs: Iterable[Document | str | TextIO],
+        *,
+        chunk: bool = True,
+        chunk_size: int = 800,
+        chunk_overlap: int = 200,
+        chunk_strategy: str = "words",
+        batch_size: int = 64,
+        parent_id_key: str = "parent_id",
+        max_batch_tokens: Optional[int] = 100_000,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        retry_backoff: float = 1.0,
+    ) -> int:
+        """
+        Async `add_documents`: up to `max_concurrency` embedding requests overlap.
+
+        Chunks are stored in input order as their batches complete.
+        """
+
+        if batch_size <= 0:
+            raise ValueError("batch_size must be > 0")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be > 0")
+        to_index = self._iter_index_docs(docs, chunk, chunk_size, chunk_overlap, chunk_strategy, parent_id_key)
+        pending: "deque[Tuple[List[Document], asyncio.Task]]" = deque()
         total_added = 0
-        i = 0
-        while i < len(to_index):
-            batch = to_index[i : i + batch_size]
-            vectors = self._embedder.embed([b.text for b in batch])
-            self._documents.extend(batch)
-            self._embeddings.extend(vectors)
-            total_added += len(batch)
-            i += batch_size
+        try:
+            for batch in _iter_batches(self._collapse_duplicates(to_index), batch_size, max_batch_tokens):
+                texts = [b.text for b in batch]
+                task = asyncio.ensure_future(self._aembed_with_retry(texts, max_retries, retry_backoff))
+                pending.append((batch, task))
+                if len(pending) >= max_concurrency:
+                    done, fut = pending.popleft()
+                    self._append(done, await fut)
+                    total_added += len(done)
+            while pending:
+                done, fut = pending.popleft()
+                self._append(done, await fut)
+                total_added += len(done)
+        finally:
+            for _, fut in pending:
+                fut.cancel()
+            self._discard_pending_signatures()
         return total_added
 
-    # --------------- Search ---------------
-    def search(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
-        """Return top-k documents with cosine similarity scores."""
-        if not self._documents:
+    async def asearch(
+        self,
+        query: str,
+        k: int = 5,
+        *,
+        exact: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+        fusion: str = "rrf",
+        alpha: float = 0.5,
+    ) -> List[Tuple[Document, float]]:
+        """Async `search`; scoring runs in a worker thread."""
+        results = await self.asearch_many([query], k, exact=exact, filter=filter, mode=mode, fusion=fusion, alpha=alpha)
+        return results[0]
+
+    async def asearch_many(
+        self,
+        queries: Sequence[str],
+        k: int = 5,
+        *,
+        exact: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+        fusion: str = "rrf",
+        alpha: float = 0.5,
+    ) -> List[List[Tuple[Document, float]]]:
+        """Async `search_many`; one embedding request, scoring in a worker thread."""
+        self._check_mode(mode, fusion, alpha)
+        if not queries:
             return []
-        qv = self._embedder.embed([query])[0]
-        scored: List[Tuple[int, float]] = []
-        for idx, v in enumerate(self._embeddings):
-            scored.append((idx, _cosine_similarity(qv, v)))
-        scored.sort(key=lambda x: x[1], reverse=True)
-        top = scored[: max(0, k)]
-        return [(self._documents[i], score) for i, score in top]
+        if not len(self):
+            return [[] for _ in queries]
+        vectors = None if mode == "lexical" else await self._aembed(list(queries))
+        return await asyncio.to_thread(self._search_texts, queries, vectors, k, exact, filter, mode, fusion, alpha)
 
     # --------------- Maintenance ---------------
+    def upsert_documents(
+        self,
+        docs: Iterable[Document],
+        *,
+        chunk: bool = True,
+        chunk_size: int = 800,
+        chunk_overlap: int = 200,
+        chunk_strategy: str = "words",
+        batch_size: int = 64,
+        parent_id_key: str = "parent_id",
+        max_batch_tokens: Optional[int] = 100_000,
+        max_concurrency: int = 1,
+        max_retries: int = 5,
+        retry_backoff: float = 1.0,
+    ) -> int:
+        """
+        Insert or replace documents by `Document.id`.
+
+        - Every chunk previously stored for an id is replaced by the new chunks.
+        - New chunks whose text matches a chunk already stored for the same id reuse
+          its vector instead of calling the embedder.
+        - Options match `add_documents`. Returns the number of chunks stored (with
+          `dedup`, collapsed duplicates are not counted).
+        """
+
+        targets: List[Document] = []
+        for d in docs:
+            if not isinstance(d, Document) or not d.id:
+                raise ValueError("upsert_documents requires Document objects with an id")
+            targets.append(d)
+        if not targets:
+            return 0
+        ids = {d.id for d in targets}
+
+        # Existing vectors per (id, content hash), copied out before the rows are dropped.
+        old_rows = self._rows_for(ids, parent_id_key)
+        reusable: Dict[Tuple[str, str], np.ndarray] = {}
+        for row in old_rows:
+            d = self._documents[row]
+            owner = d.metadata.get(parent_id_key, d.id) if chunk else d.id
+            reusable.setdefault((owner, _content_hash(d.text)), self._matrix[row].copy())
+
+        # Before the new chunks are checked, so their duplicate references are not pruned.
+        old_rows = self._detach_duplicates(ids, old_rows, parent_id_key)
+        to_index = self._iter_index_docs(targets, chunk, chunk_size, chunk_overlap, chunk_strategy, parent_id_key)
+        try:
+            new_docs = list(self._collapse_duplicates(to_index, exclude=old_rows))
+            vectors: List[Optional[np.ndarray]] = []
+            to_embed: List[int] = []
+            for pos, d in enumerate(new_docs):
+                owner = d.metadata.get(parent_id_key, d.id) if chunk else d.id
+                vector = reusable.get((owner, _content_hash(d.text)))
+                vectors.append(vector)
+                if vector is None:
+                    to_embed.append(pos)
+
+            embed_docs = [new_docs[pos] for pos in to_embed]
+            batches = _iter_batches(embed_docs, batch_size, max_batch_tokens)
+            fresh = iter(to_embed)
+            for batch, batch_vectors in self._embed_batches(batches, max_concurrency, max_retries, retry_backoff):
+                for vector in batch_vectors:
+                    vectors[next(fresh)] = np.asarray(vector, dtype=np.float32)
+        except BaseException:
+            self._discard_pending_signatures()
+            raise
+
+        self._mark_deleted(old_rows)
+        if new_docs:
+            self._append(new_docs, np.stack(vectors))  # type: ignore[arg-type]
+        self._maybe_compact()
+        return len(new_docs)
+
+    def delete(self, ids: Iterable[str], *, parent_id_key: str = "parent_id") -> int:
+        """
+        Delete chunks by chunk id or by the parent document id they were split from.
+
+        A stored chunk that also stands for collapsed duplicates from other sources is
+        kept and taken over by the first of them. Returns the number of chunks removed.
+        """
+        ids = set(ids)
+        rows = self._detach_duplicates(ids, self._rows_for(ids, parent_id_key), parent_id_key)
+        self._mark_deleted(rows)
+        self._maybe_compact()
+        return len(rows)
+
+    def _candidate_rows(self, ids: set, parent_id_key: str) -> List[int]:
+        """
+        Sorted live rows whose chunk id or parent id is in `ids`, plus the rows holding
+        collapsed duplicates that match; looked up in the id map and metadata index.
+        """
+        if not ids:
+            return []
+        found = [np.asarray(self._id_rows.get(i, ()), dtype=np.int64) for i in ids]
+        found.append(self._metadata_index.match({parent_id_key: {"$in": list(ids)}}))
+        rows = np.unique(np.concatenate(found))
+        return rows[self._alive[rows]].tolist()
+
+    def _rows_for(self, ids: set, parent_id_key: str) -> List[int]:
+        """Live rows whose chunk id or parent id is in `ids`."""
+        docs = self._documents
+        return [
+            row
+            for row in self._candidate_rows(ids, parent_id_key)
+            if docs[row].id in ids or docs[row].metadata.get(parent_id_key) in ids
+        ]
+
+    def _detach_duplicates(self, ids: set, rows: List[int], parent_id_key: str) -> List[int]:
+        """
+        Remove duplicate references belonging to `ids` and return the `rows` still to delete.
+
+        A row in `rows` whose collapsed duplicates are not all deleted is handed over to
+        the first survivor (its id and metadata) instead of being deleted.
+        """
+
+        if not self._has_duplicates:
+            return rows
+
+        def deleted(ref: Dict[str, Any]) -> bool:
+            return ref["id"] in ids or ref["metadata"].get(parent_id_key) in ids
+
+        with self._lock:
+            doomed = set(rows)
+            changed = False
+            for row in self._candidate_rows(ids, parent_id_key):
+                d = self._documents[row]
+                refs = d.metadata.get(_DUPLICATES_KEY)
+                if not refs:
+                    continue
+                survivors = [ref for ref in refs if not deleted(ref)]
+                if row in doomed and survivors:
+                    heir, survivors = survivors[0], survivors[1:]
+                    self._documents[row] = Document(text=d.text, metadata=dict(heir["metadata"]), id=heir["id"])
+                    if survivors:
+                        self._documents[row].metadata[_DUPLICATES_KEY] = survivors
+                    doomed.discard(row)
+                    changed = True
+                elif row not in doomed and len(survivors) < len(refs):
+                    meta = {k: v for k, v in d.metadata.items() if k != _DUPLICATES_KEY}
+                    if survivors:
+                        meta[_DUPLICATES_KEY] = survivors
+                    self._documents[row] = Document(text=d.text, metadata=meta, id=d.id)
+                    changed = True
+            if changed:
+                # Postings cannot be removed one by one, so rebuild the metadata index.
+                self._metadata_index.reset()
+                self._id_rows.clear()
+                self._has_duplicates = False
+                self._index_metadata(self._documents, 0)
+            return [row for row in rows if row in doomed]
+
+    def _mark_deleted(self, rows: List[int]) -> None:
+        with self._lock:
+            if rows:
+                self._alive[rows] = False
+                self._n_dead += len(rows)
+
+    def _maybe_compact(self) -> None:
+        if self._n_dead and self._n_dead >= _COMPACT_RATIO * self._size:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Drop deleted rows so the embedding matrix is dense again.
+
+        Runs automatically once deleted rows reach a quarter of the store; row order
+        of the remaining documents is preserved.
+        """
+        with self._lock:
+            if not self._n_dead:
+                return
+            keep = self._alive[: self._size].copy()
+            self._matrix = self._matrix[: self._size][keep]
+            self._documents = [d for d, k in zip(self._documents, keep) if k]
+            self._metadata_index.reset()
+            self._id_rows.clear()
+            self._has_duplicates = False
+            self._index_metadata(self._documents, 0)
+            self._size = self._matrix.shape[0]
+            self._alive = np.ones(self._size, dtype=bool)
+            self._n_dead = 0
+            if self._quantizer is not None:
+                self._quantizer.compact(keep)
+            if self._index is not None:
+                self._index.compact(keep)
+            if self._lexical is not None:
+                self._lexical.compact(keep)
+            if self._dedup is not None:
+                self._dedup.compact(keep)
+
     def clear(self) -> None:
-        self._documents.clear()
-        self._embeddings.clear()
+        with self._lock:
+            self._documents.clear()
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+            self._size = 0
+            self._alive = np.ones(0, dtype=bool)
+            self._n_dead = 0
+            self._metadata_index.reset()
+            self._id_rows.clear()
+            self._has_duplicates = False
+            if self._quantizer is not None:
+                self._quantizer.reset()
+            if self._index is not None:
+                self._index.reset()
+            if self._lexical is not None:
+                self._lexical.reset()
+            if self._dedup is not None:
+                self._dedup.reset()
 
     # --------------- Persistence ---------------
-    def save(self, path: str) -> None:
+    def _embedder_info(self) -> Dict[str, Any]:
+        return {
+            "type": self._embedder.__class__.__name__,
+            # Saving the model may help ensure compatibility when reloading
+            **({"model": getattr(self._embedder, "model", None)}),
+        }
+
+    def save(self, path: str, *, format: Optional[str] = None) -> None:
+        """
+        Persist the store to `path`.
+
+        - format="binary" writes a directory holding `vectors.npy` (raw float32
+          matrix), `documents.jsonl` (one document per line) and `manifest.json`.
+        - format="json" writes the legacy single-file JSON layout.
+        - By default an existing file or a `.json` path keeps the legacy JSON layout, so
+          a store loaded from `store.json` can be saved back to it; anything else is binary.
+        """
         if not path:
             raise ValueError("path is required")
+        if format is None:
+            format = "json" if os.path.isfile(path) or path.lower().endswith(".json") else "binary"
+        if format == "binary":
+            if os.path.isfile(path):
+                raise ValueError(
+                    f"{path} is a file; the binary format needs a directory. "
+                    'Pass format="json" to overwrite it, or save to a directory path.'
+                )
+            self._save_binary(path)
+        elif format == "json":
+            self._save_json(path)
+        else:
+            raise ValueError(f"Unsupported save format: {format}")
+
+    def _save_json(self, path: str) -> None:
+        self.compact()
         data = {
-            "embedder": {
-                "type": self._embedder.__class__.__name__,
-                # Saving the model may help ensure compatibility when reloading
-                **({"model": getattr(self._embedder, "model", None)}),
-            },
+            "embedder": self._embedder_info(),
             "items": [
                 {
                     "document": {
@@ -249,27 +1384,137 @@ class VectorStore:
                         "metadata": d.metadata,
                         "id": d.id,
                     },
-                    "embedding": emb,
+                    "embedding": emb.tolist(),
                 }
-                for d, emb in zip(self._documents, self._embeddings)
+                for d, emb in zip(self._documents, self._matrix[: self._size])
             ],
         }
         with open(path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False)
 
+    def _save_binary(self, path: str) -> None:
+        self.compact()
+        os.makedirs(path, exist_ok=True)
+        manifest = {
+            "format": _BINARY_FORMAT,
+            "version": _BINARY_VERSION,
+            "embedder": self._embedder_info(),
+            "count": self._size,
+            "dimension": int(self._matrix.shape[1]),
+        }
+        if self._index is not None:
+            manifest["index"] = self._index.config()
+            index_tmp = os.path.join(path, _INDEX_FILE + ".tmp")
+            with open(index_tmp, "wb") as f:
+                np.savez(f, **self._index.arrays())
+        if self._quantizer is not None:
+            manifest["quantization"] = {**self._quantizer.config(), "rescore": self._rescore}
+            quantized_tmp = os.path.join(path, _QUANTIZED_FILE + ".tmp")
+            with open(quantized_tmp, "wb") as f:
+                np.savez(f, **self._quantizer.arrays())
+        if self._lexical is not None:
+            manifest["lexical"] = self._lexical.config()
+            lexical_tmp = os.path.join(path, _LEXICAL_FILE + ".tmp")
+            with open(lexical_tmp, "wb") as f:
+                np.savez(f, **self._lexical.arrays())
+        if self._dedup is not None:
+            manifest["dedup"] = self._dedup.config()
+            dedup_tmp = os.path.join(path, _DEDUP_FILE + ".tmp")
+            with open(dedup_tmp, "wb") as f:
+                np.savez(f, **self._dedup.arrays())
+        # Write each file next to its final name and swap it in, so a crash never
+        # leaves a half-written file behind under the real name.
+        vectors_tmp = os.path.join(path, _VECTORS_FILE + ".tmp")
+        with open(vectors_tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(self._matrix[: self._size]))
+        docs_tmp = os.path.join(path, _DOCUMENTS_FILE + ".tmp")
+        with open(docs_tmp, "w", encoding="utf-8") as f:
+            for d in self._documents:
+                f.write(json.dumps({"text": d.text, "metadata": d.metadata, "id": d.id}, ensure_ascii=False))
+                f.write("\n")
+        manifest_tmp = os.path.join(path, _MANIFEST_FILE + ".tmp")
+        with open(manifest_tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(vectors_tmp, os.path.join(path, _VECTORS_FILE))
+        os.replace(docs_tmp, os.path.join(path, _DOCUMENTS_FILE))
+        if self._index is not None:
+            os.replace(index_tmp, os.path.join(path, _INDEX_FILE))
+        if self._quantizer is not None:
+            os.replace(quantized_tmp, os.path.join(path, _QUANTIZED_FILE))
+        if self._lexical is not None:
+            os.replace(lexical_tmp, os.path.join(path, _LEXICAL_FILE))
+        if self._dedup is not None:
+            os.replace(dedup_tmp, os.path.join(path, _DEDUP_FILE))
+        os.replace(manifest_tmp, os.path.join(path, _MANIFEST_FILE))
+
     @classmethod
-    def load(cls, path: str, embedder: Embedder) -> "VectorStore":
+    def load(cls, path: str, embedder: Embedder, *, mmap: bool = False) -> "VectorStore":
+        """
+        Load a store written by `save`.
+
+        - Binary directories are detected automatically; anything else is read as legacy JSON.
+        - With mmap=True the vector block is memory-mapped read-only instead of copied into
+          RAM. Adding documents later copies it into a growable in-memory buffer.
+        - An ANN index, quantized codes, BM25 index or duplicate detector saved with the
+          store are restored with their settings.
+        """
         if not os.path.exists(path):
             raise FileNotFoundError(path)
+        if os.path.isdir(path):
+            return cls._load_binary(path, embedder, mmap=mmap)
+        return cls._load_json(path, embedder)
+
+    @classmethod
+    def _load_binary(cls, path: str, embedder: Embedder, *, mmap: bool) -> "VectorStore":
+        with open(os.path.join(path, _MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != _BINARY_FORMAT:
+            raise ValueError(f"{path} is not a VectorStore directory")
+        if manifest.get("version", 0) > _BINARY_VERSION:
+            raise ValueError(f"Unsupported VectorStore format version: {manifest.get('version')}")
+        matrix = np.load(os.path.join(path, _VECTORS_FILE), mmap_mode="r" if mmap else None)
+        docs: List[Document] = []
+        with open(os.path.join(path, _DOCUMENTS_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                doc = json.loads(line)
+                docs.append(Document(text=doc.get("text", ""), metadata=doc.get("metadata", {}), id=doc.get("id")))
+        if matrix.ndim != 2 or matrix.dtype != np.float32 or matrix.shape[0] != len(docs):
+            raise ValueError(f"{path}: vectors do not match documents")
+        index: Optional[VectorIndex] = None
+        if "index" in manifest:
+            with np.load(os.path.join(path, _INDEX_FILE)) as arrays:
+                index = load_index(manifest["index"], dict(arrays))
+        vs = cls(embedder, index=index, rescore=manifest.get("quantization", {}).get("rescore", 4))
+        if "quantization" in manifest:
+            with np.load(os.path.join(path, _QUANTIZED_FILE)) as arrays:
+                vs._quantizer = load_quantizer(manifest["quantization"], dict(arrays))
+        if "lexical" in manifest:
+            with np.load(os.path.join(path, _LEXICAL_FILE)) as arrays:
+                vs._lexical = BM25Index.from_state(manifest["lexical"], dict(arrays))
+        if "dedup" in manifest:
+            with np.load(os.path.join(path, _DEDUP_FILE)) as arrays:
+                vs._dedup = MinHashLSH.from_state(manifest["dedup"], dict(arrays))
+        vs._matrix = matrix
+        vs._size = matrix.shape[0]
+        vs._alive = np.ones(vs._size, dtype=bool)
+        vs._documents = docs
+        vs._index_metadata(docs, 0)
+        return vs
+
+    @classmethod
+    def _load_json(cls, path: str, embedder: Embedder) -> "VectorStore":
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
         vs = cls(embedder)
         items = data.get("items", [])
+        docs: List[Document] = []
+        vectors: List[List[float]] = []
         for item in items:
             doc = item.get("document", {})
             d = Document(text=doc.get("text", ""), metadata=doc.get("metadata", {}), id=doc.get("id"))
             emb = item.get("embedding", [])
             if d.text and emb:
-                vs._documents.append(d)
-                vs._embeddings.append(list(emb))
+                docs.append(d)
+                vectors.append(emb)
+        vs._append(docs, vectors)
         return vs
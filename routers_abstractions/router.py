@@ -0,0 +1,267 @@
+# latency-aware router over OpenAI-compatible providers (OpenAI, Gemini, Groq, OpenRouter, Ollama, ...)
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+from openai import BadRequestError, OpenAI
+
+load_dotenv()
+
+
+class LatencyStats:
+    """Moving average (EWMA) and tail latency over the last `window` successful calls."""
+
+    def __init__(self, alpha=0.2, window=100):
+        self.alpha = alpha
+        self.samples = deque(maxlen=window)
+        self.ewma = None
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+            self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+
+    def percentile(self, p):
+        with self.lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a backend after `failure_threshold` consecutive failures.
+
+    - closed: requests flow.
+    - open: requests are skipped for `reset_timeout` seconds.
+    - half-open: one probe request is let through; success closes, failure re-opens.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def available(self):
+        state = self.state
+        return state == "closed" or (state == "half-open" and not self.probing)
+
+    def acquire(self):
+        """True if a request may be sent now (takes the single probe slot when half-open)."""
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+
+@dataclass
+class Backend:
+    name: str
+    client: OpenAI
+    model: str
+    stats: LatencyStats = field(default_factory=LatencyStats)
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+
+    @property
+    def key(self):
+        return f"{self.name}/{self.model}"
+
+
+def openai_backend(name, model, base_url=None, api_key=None, timeout=30.0):
+    # the router does its own failover, so the SDK must not retry and hide failures / latency
+    client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+    return Backend(name=name, client=client, model=model)
+
+
+def default_backends():
+    """Providers used in this repo, for those whose API key is set (Ollama is always tried)."""
+    env = os.getenv
+    backends = []
+    if env("OPENAI_API_KEY"):
+        backends.append(openai_backend("openai", "gpt-4o-mini", api_key=env("OPENAI_API_KEY")))
+    if env("GEMINI_API_KEY"):
+        backends.append(openai_backend("gemini", "gemini-2.5-flash", api_key=env("GEMINI_API_KEY"),
+                                       base_url="https://generativelanguage.googleapis.com/v1beta/openai/"))
+    if env("GROQ_API_KEY"):
+        backends.append(openai_backend("groq", "openai/gpt-oss-120b", api_key=env("GROQ_API_KEY"),
+                                       base_url="https://api.groq.com/openai/v1/"))
+    if env("OPEN_ROUTER_API_KEY"):
+        backends.append(openai_backend("openrouter", "z-ai/glm-4.5", api_key=env("OPEN_ROUTER_API_KEY"),
+                                       base_url=env("OPEN_ROUTER_API_URL", "https://openrouter.ai/api/v1")))
+    backends.append(openai_backend("ollama", "llama3.2:1b", api_key="ollama",
+                                   base_url=env("OLLAMA_URL", "http://localhost:11434/v1")))
+    return backends
+
+
+class RouterError(Exception):
+    def __init__(self, message, errors=()):
+        super().__init__(message)
+        # (backend key, exception) for every failed attempt
+        self.errors = list(errors)
+
+
+@dataclass
+class RoutedResponse:
+    response: object  # openai ChatCompletion
+    backend: str
+    latency: float
+    hedged: bool
+
+
+class Router:
+    """
+    Sends each chat completion to the fastest healthy backend.
+
+    - Backends are ranked by their moving-average latency; ones without samples go first
+      so every backend gets measured.
+    - Hedging: if the first backend has not answered after its p95 latency (or
+      `hedge_delay` until it has `min_samples` calls), the next backend is called too
+      and whichever answers first wins. The slower call still updates the statistics.
+    - A failing backend is skipped for the rest of the request and counts towards its
+      circuit breaker; the next backend is tried until one succeeds.
+    - Bad requests (HTTP 400) are the caller's error and are raised right away.
+    """
+
+    def __init__(self, backends, *, hedge=True, hedge_delay=2.0, min_hedge_delay=0.05, min_samples=5,
+                 max_workers=16):
+        if not backends:
+            raise ValueError("at least one backend is required")
+        self.backends = list(backends)
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="router")
+
+    def ranked(self):
+        """Available backends, fastest first."""
+        available = [b for b in self.backends if b.breaker.available()]
+        # stable sort: untried backends first (in the given order), then by moving average
+        return sorted(available, key=lambda b: (b.stats.ewma is not None, b.stats.ewma or 0.0))
+
+    def _hedge_after(self, backend):
+        if len(backend.stats) < self.min_samples:
+            return self.hedge_delay
+        return max(self.min_hedge_delay, backend.stats.percentile(95))
+
+    def _call(self, backend, messages, kwargs):
+        started = time.monotonic()
+        try:
+            response = backend.client.chat.completions.create(model=backend.model, messages=messages, **kwargs)
+        except BadRequestError:
+            backend.breaker.success()  # the backend answered; the request was wrong
+            raise
+        except Exception:
+            backend.breaker.failure()
+            raise
+        latency = time.monotonic() - started
+        backend.stats.record(latency)
+        backend.breaker.success()
+        return response, latency
+
+    def complete(self, messages, **kwargs):
+        """Chat completion from the first backend to answer; extra kwargs go to `create`."""
+        candidates = iter(self.ranked())
+        pending = {}
+        errors = []
+
+        def launch():
+            for backend in candidates:
+                if backend.breaker.acquire():
+                    pending[self.executor.submit(self._call, backend, messages, kwargs)] = backend
+                    return True
+            return False
+
+        if not launch():
+            raise RouterError("no healthy backend (all circuit breakers are open)")
+        hedged = False
+        while pending:
+            timeout = None
+            if self.hedge and not hedged:
+                timeout = self._hedge_after(next(iter(pending.values())))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # the first backend is slower than usual: race it against the next one
+                launch()
+                hedged = True
+                continue
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    response, latency = future.result()
+                except BadRequestError:
+                    raise
+                except Exception as e:
+                    errors.append((backend.key, e))
+                    # replace the failed call, even while a hedged call is still running
+                    launch()
+                    continue
+                return RoutedResponse(response=response, backend=backend.key, latency=latency, hedged=hedged)
+        raise RouterError(f"all backends failed: {[key for key, _ in errors]}", errors)
+
+    def stats(self):
+        return [
+            {
+                "backend": b.key,
+                "state": b.breaker.state,
+                "samples": len(b.stats),
+                "ewma_ms": None if b.stats.ewma is None else round(b.stats.ewma * 1000, 1),
+                "p95_ms": None if not len(b.stats) else round(b.stats.percentile(95) * 1000, 1),
+                "consecutive_failures": b.breaker.failures,
+            }
+            for b in self.backends
+        ]
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    router = Router(default_backends())
+    message = [
+        {
+            "role": "user",
+            "content": "tell a joke"
+        }
+    ]
+    result = router.complete(message)
+    print(f"[{result.backend}, {result.latency:.2f}s{', hedged' if result.hedged else ''}]")
+    print(result.response.choices[0].message.content)
+    print(router.stats())
+    router.close()